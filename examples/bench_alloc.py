@@ -0,0 +1,28 @@
+# heap bytes allocated per draw call in steady state
+# (on the CPython stand-in the figures also count ints above 256 and
+# other interpreter objects MicroPython does not allocate)
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+from ili9341.fonts import glcdfont, tt14, tt32
+
+from benchutil import allocated
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+
+print('{:<24} {:>8}'.format('call', 'bytes'))
+print('{:<24} {:>8}'.format('fill_rectangle 3x3',
+    allocated(display.fill_rectangle, 10, 10, 3, 3, color565(255, 0, 0))))
+print('{:<24} {:>8}'.format('fill_rectangle 240x40',
+    allocated(display.fill_rectangle, 0, 40, 240, 40, color565(0, 0, 255))))
+print('{:<24} {:>8}'.format('pixel',
+    allocated(display.pixel, 20, 20, color565(0, 255, 0))))
+print('{:<24} {:>8}'.format('scroll',
+    allocated(display.scroll, 0)))
+for font in (glcdfont, tt14, tt32):
+    display.set_font(font)
+    print('{:<24} {:>8}'.format('chars ' + font.__name__.split('.')[-1],
+        allocated(display.chars, '12.5', 10, 100)))
@@ -0,0 +1,52 @@
+# a 48x48 four color icon drawn rectangle by rectangle, one fill per run of
+# equal pixels in a row, compared with blit_indexed on its 2 bit data and
+# blit_rgb565 on the same picture as RGB565
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+
+from benchutil import allocated, count, timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+palette = (color565(0, 0, 0), color565(255, 0, 0), color565(255, 255, 0),
+    color565(0, 0, 255))
+size = 48
+
+# concentric rings of the four colors, 2 bit indices, 4 pixels a byte
+def index(x, y):
+    return max(abs(x - size // 2), abs(y - size // 2)) // 6 & 3
+
+indices = bytearray(size * size // 4)
+rgb = bytearray(size * size * 2)
+for y in range(size):
+    for x in range(size):
+        k = index(x, y)
+        indices[(y * size + x) >> 2] |= k << (6 - 2 * (x & 3))
+        rgb[(y * size + x) * 2] = palette[k] >> 8
+        rgb[(y * size + x) * 2 + 1] = palette[k] & 255
+rgb = bytes(rgb)
+
+def rectangles(x0, y0):
+    for y in range(size):
+        start = 0
+        for x in range(1, size + 1):
+            if x == size or index(x, y) != index(start, y):
+                display.fill_rectangle(x0 + start, y0 + y, x - start, 1,
+                    palette[index(start, y)])
+                start = x
+
+def indexed(x0, y0):
+    display.blit_indexed(indices, x0, y0, size, size, palette, 2)
+
+def direct(x0, y0):
+    display.blit_rgb565(rgb, x0, y0, size, size)
+
+print('{:<12} {:>8} {:>10} {:>8}'.format('icon', 'trans', 'us', 'alloc'))
+for name, fn in (('rectangles', rectangles), ('blit_indexed', indexed),
+        ('blit_rgb565', direct)):
+    print('{:<12} {:>8} {:>10} {:>8}'.format(name,
+        count(display, fn, 96, 136).transactions, timeit(fn, 96, 136),
+        allocated(fn, 96, 136, repeat = 10)))
@@ -0,0 +1,45 @@
+# replays widget update traces through DirtyRegion and reports windows
+# opened and bytes sent for three repaint strategies
+# MIT License
+
+from ili9341.dirty import DirtyRegion, WINDOW_BYTES
+
+def area(r):
+    return (r[2] - r[0] + 1) * (r[3] - r[1] + 1)
+
+def rect(x, y, w, h):
+    return (x, y, x + w - 1, y + h - 1)
+
+# each trace is one frame's worth of invalidations, x0, y0, x1, y1
+traces = {
+    # clock digits redrawn one by one
+    'clock': [rect(20 + 26 * i, 40, 24, 32) for i in range(6)],
+    # status bar icons plus a footer label
+    'status': [rect(0, 0, 16, 16), rect(20, 0, 16, 16), rect(200, 0, 40, 16),
+        rect(0, 304, 120, 16)],
+    # list selection moving down one row: old and new row
+    'list': [rect(0, 60, 240, 20), rect(0, 80, 240, 20)],
+    # progress bar growing plus its percentage text over it
+    'progress': [rect(10, 150, 180, 12), rect(100, 150, 30, 12),
+        rect(195, 150, 35, 12)],
+    # popup over a panel: overlapping boxes
+    'popup': [rect(40, 100, 160, 100), rect(30, 90, 180, 20),
+        rect(50, 120, 140, 16), rect(50, 140, 140, 16), rect(50, 160, 140, 16)],
+    # sensor readouts spread over the screen
+    'readouts': [rect(10, 40, 60, 16), rect(170, 40, 60, 16),
+        rect(10, 280, 60, 16), rect(170, 280, 60, 16)],
+}
+
+print('{:<10} {:>12} {:>14} {:>14}'.format('trace', 'per widget', 'bounding box', 'merged'))
+for name, trace in traces.items():
+    naive = sum(WINDOW_BYTES + 2 * area(r) for r in trace)
+    bbox = (min(r[0] for r in trace), min(r[1] for r in trace),
+        max(r[2] for r in trace), max(r[3] for r in trace))
+    region = DirtyRegion()
+    for r in trace:
+        region.add(*r)
+    merged = region.cost()
+    print('{:<10} {:>3} {:>8} {:>3} {:>10} {:>3} {:>10}'.format(name,
+        len(trace), naive, 1, WINDOW_BYTES + 2 * area(bbox),
+        len(region.windows()), merged))
+print('(windows and bytes per frame)')
@@ -0,0 +1,60 @@
+# text throughput of blit's byte-wise table expansion compared with the
+# per-pixel loop it replaced
+# MIT License
+
+from hwspi.hwspi import VSPI
+from framebuf import FrameBuffer, MONO_VLSB
+
+from ili9341 import ILI9341
+from ili9341.constants import CHUNK
+from ili9341.fonts import glcdfont, tt14, tt32
+
+from benchutil import timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+text = 'Temp 21.5C'
+
+def text_fb(font, text):
+    # the string as one MONO_VLSB FrameBuffer, like chars builds it
+    w = font.get_width(text)
+    nbytes = (font.height() + 7) // 8
+    buf = bytearray(w * nbytes)
+    pos = 0
+    for ch in text:
+        glyph, char_w = font.get_ch(ch)
+        for row in range(nbytes):
+            for i in range(char_w):
+                buf[row * w + pos + i] = glyph[nbytes * i + row]
+        pos += char_w
+    return FrameBuffer(buf, w, font.height(), MONO_VLSB), w
+
+def per_pixel_blit(bitbuff, x, y, w, h):
+    # the previous blit inner loop: one pixel() call and two colormap
+    # lookups per pixel
+    d = display
+    with d.spi as spi:
+        d._window(spi, x, y, x + w - 1, y + h - 1)
+        written = 0
+        for iy in range(h):
+            for ix in range(w):
+                index = ix + iy * w - written
+                if index >= CHUNK:
+                    spi.write(d._buf)
+                    written += CHUNK
+                    index -= CHUNK
+                c = bitbuff.pixel(ix, iy)
+                d._buf[index * 2] = d._colormap[c * 2]
+                d._buf[index * 2 + 1] = d._colormap[c * 2 + 1]
+        rest = w * h - written
+        if rest:
+            spi.write(memoryview(d._buf)[:rest * 2])
+
+print('{:<10} {:>14} {:>14}'.format('font', 'per pixel px/s', 'table px/s'))
+for font in (glcdfont, tt14, tt32):
+    fb, w = text_fb(font, text)
+    h = font.height()
+    old = timeit(per_pixel_blit, fb, 0, 100, w, h, repeat = 10)
+    new = timeit(display.blit, fb, 0, 100, w, h, repeat = 10)
+    print('{:<10} {:>14} {:>14}'.format(font.__name__.split('.')[-1],
+        w * h * 1000000 // old, w * h * 1000000 // new))
@@ -0,0 +1,48 @@
+# small fills: refilling the whole pixel buffer on every call, as
+# fill_rectangle used to, compared with the fill engine, without and with
+# the fill cache, for a blinking cursor between two colors
+# MIT License
+
+from ustruct import pack
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+from ili9341.constants import CHUNK
+
+from benchutil import timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+on = color565(255, 255, 255)
+off = color565(0, 0, 64)
+
+def refill(x, y, w, h, color):
+    # the previous fill_rectangle, filling the buffer a pixel at a time
+    d = display
+    buf = d._buf
+    color = pack('>H', color)
+    for i in range(CHUNK):
+        buf[2*i] = color[0]; buf[2*i+1] = color[1]
+    chunks, rest = divmod(w * h, CHUNK)
+    with d.spi as spi:
+        d._window(spi, x, y, x + w - 1, y + h - 1)
+        for count in range(chunks):
+            spi.write(buf)
+        if rest != 0:
+            spi.write(memoryview(buf)[:rest * 2])
+
+def blink(fn, w, h):
+    fn(100, 100, w, h, on)
+    fn(100, 100, w, h, off)
+
+print('{:<8} {:>10} {:>10} {:>10}'.format('size', 'refill us', 'engine us',
+    'cached us'))
+for w, h in ((3, 3), (2, 14), (16, 16), (60, 8)):
+    old = timeit(blink, refill, w, h)
+    new = timeit(blink, display.fill_rectangle, w, h)
+    display.fill_cache()
+    cached = timeit(blink, display.fill_rectangle, w, h)
+    display.fill_cache(0)
+    print('{:<8} {:>10} {:>10} {:>10}'.format('{}x{}'.format(w, h),
+        old, new, cached))
@@ -0,0 +1,72 @@
+# text throughput of a horizontally mapped (font_to_py -x) font compared
+# with the vertically mapped build of the same font. The hmap build is made
+# here from the vmap module so that both hold exactly the same glyphs. The
+# last column sends the vmap font column major with column_text().
+# MIT License
+
+from hwspi.hwspi import VSPI
+from framebuf import FrameBuffer, MONO_VLSB, MONO_HLSB
+
+from ili9341 import ILI9341
+from ili9341.fonts import glcdfont, tt14, tt32
+
+from benchutil import timeit
+
+class HmapFont:
+    # the font module interface over MONO_HLSB glyphs converted by framebuf
+
+    def __init__(self, font):
+        self._vmap = font
+        self._height = font.height()
+        self._glyphs = {}
+        nbytes = (self._height + 7) // 8
+        for c in range(32, 127):
+            ch = chr(c)
+            glyph, w = font.get_ch(ch)
+            # font glyphs are column major, MONO_VLSB is row major
+            vbuf = bytearray(w * nbytes)
+            for row in range(nbytes):
+                for i in range(w):
+                    vbuf[row * w + i] = glyph[nbytes * i + row]
+            hbuf = bytearray((w + 7) // 8 * self._height)
+            FrameBuffer(hbuf, w, self._height, MONO_HLSB).blit(
+                FrameBuffer(vbuf, w, self._height, MONO_VLSB), 0, 0)
+            self._glyphs[ch] = (memoryview(hbuf), w)
+
+    def height(self):
+        return self._height
+
+    def max_width(self):
+        return self._vmap.max_width()
+
+    def hmap(self):
+        return True
+
+    def reverse(self):
+        return False
+
+    def get_width(self, s):
+        return self._vmap.get_width(s)
+
+    def get_ch(self, ch):
+        return self._glyphs.get(ch, self._glyphs[' '])
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+text = 'Temp 21.5C'
+
+print('{:<10} {:>12} {:>12} {:>12}'.format('font', 'vmap px/s', 'hmap px/s',
+    'MV px/s'))
+for font in (glcdfont, tt14, tt32):
+    pixels = font.get_width(text) * font.height()
+    result = []
+    for f in (font, HmapFont(font)):
+        display.set_font(f)
+        result.append(timeit(display.chars, text, 0, 100, repeat = 10))
+    display.set_font(font)
+    display.column_text()
+    result.append(timeit(display.chars, text, 0, 100, repeat = 10))
+    display.column_text(False)
+    print('{:<10} {:>12} {:>12} {:>12}'.format(font.__name__.split('.')[-1],
+        pixels * 1000000 // result[0], pixels * 1000000 // result[1],
+        pixels * 1000000 // result[2]))
@@ -0,0 +1,63 @@
+# time to paint a full screen image streamed from a file, raw RGB565 and
+# 16 and 24 bit BMP, against the time the pixels alone take on the wire at
+# the default baud rate
+# MIT License
+
+from os import remove
+from ustruct import pack
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341
+from ili9341.constants import DEFAULT_BAUDRATE
+
+from benchutil import count, timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+w = display.width
+h = display.height
+
+def pixel(x, y):
+    # a gradient, red across and green down
+    return x * 255 // (w - 1), y * 255 // (h - 1), 128
+
+def write(path, kind):
+    # written a row at a time, BMP rows bottom-up and padded to 4 bytes
+    size = 3 if kind == 'bmp24' else 2
+    stride = w * size if kind == 'raw' else (w * size + 3) & ~3
+    with open(path, 'wb') as f:
+        if kind == 'raw':
+            f.write(pack('<HH', w, h))
+            order = range(h)
+        else:
+            masks = pack('<III', 0xF800, 0x07E0, 0x001F) if size == 2 else b''
+            offset = 54 + len(masks)
+            f.write(b'BM' + pack('<IHHI', offset + stride * h, 0, 0, offset))
+            f.write(pack('<IiiHHIIiiII', 40, w, h, 1, size * 8,
+                3 if size == 2 else 0, stride * h, 0, 0, 0, 0))
+            f.write(masks)
+            order = range(h - 1, -1, -1)
+        row = bytearray(stride)
+        fmt = '>H' if kind == 'raw' else '<H'
+        for y in order:
+            for x in range(w):
+                r, g, b = pixel(x, y)
+                if size == 3:
+                    row[x * 3] = b; row[x * 3 + 1] = g; row[x * 3 + 2] = r
+                else:
+                    row[x * 2:x * 2 + 2] = pack(fmt,
+                        (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3)
+            f.write(row)
+
+wire = w * h * 2 * 8 * 1000 // (DEFAULT_BAUDRATE // 1000)
+print('pixels alone take {} us at {} baud'.format(wire, DEFAULT_BAUDRATE))
+print('{:<8} {:>8} {:>10}'.format('file', 'trans', 'us'))
+for kind in ('raw', 'bmp16', 'bmp24'):
+    path = 'bench.' + kind
+    write(path, kind)
+    try:
+        print('{:<8} {:>8} {:>10}'.format(kind,
+            count(display, display.image, path).transactions,
+            timeit(display.image, path, repeat = 3)))
+    finally:
+        remove(path)
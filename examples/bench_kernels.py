@@ -0,0 +1,40 @@
+# speedup of the viper kernels over their pure Python versions
+# MIT License
+
+from ili9341.constants import CHUNK
+from ili9341 import kernels
+from ili9341.fonts import tt32
+
+from benchutil import timeit
+
+try:
+    from ili9341 import kernels_viper
+except (ImportError, SyntaxError, ValueError, AttributeError, TypeError):
+    kernels_viper = None
+    print('viper emitter not available, pure Python only')
+
+lut = bytearray(256 * 16)
+kernels.build_lut(b'\x00\x00\xff\xff', lut)
+lut = memoryview(lut)
+src = bytearray(range(256)) * 4
+dst = bytearray(CHUNK * 3)
+glyph, char_w = tt32.get_ch('W')
+nbytes = (tt32.height() + 7) // 8
+text = bytearray(char_w * nbytes)
+
+cases = (
+    # name, function name, arguments
+    ('bits 1024 px', 'bits', (src, 0, CHUNK, dst, 0, lut)),
+    ('fill 1024 px', 'fill', (dst, CHUNK, 0xF800)),
+    ('transpose tt32 W', 'transpose', (glyph, nbytes, char_w, text, char_w, 0)),
+    ('rgb666 1024 px', 'rgb666_to_565', (src + src + src, dst, 0, CHUNK)),
+)
+
+print('{:<18} {:>10} {:>10} {:>8}'.format('kernel', 'python us', 'viper us', 'speedup'))
+for name, fn, args in cases:
+    py = timeit(getattr(kernels, fn), *args)
+    if kernels_viper is None:
+        print('{:<18} {:>10}'.format(name, py))
+        continue
+    vp = timeit(getattr(kernels_viper, fn), *args)
+    print('{:<18} {:>10} {:>10} {:>7}x'.format(name, py, vp, py // max(1, vp)))
@@ -0,0 +1,25 @@
+# blit time with a single pixel buffer versus the ping-pong pipeline,
+# measured against a stand-in bus that only simulates transfer latency
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341
+from ili9341.constants import DEFAULT_BAUDRATE
+from ili9341.fonts import tt14, tt32
+
+from benchutil import LatencySPI, DMALatencySPI, timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+text = 'Pipeline 0123456789'
+
+print('{:<8} {:>10} {:>12} {:>12}'.format('font', 'baudrate', 'blocking us', 'pipelined us'))
+for baudrate in (DEFAULT_BAUDRATE, DEFAULT_BAUDRATE // 10):
+    for font in (tt14, tt32):
+        display.set_font(font)
+        display.spi = LatencySPI(baudrate)
+        blocking = timeit(display.chars, text, 0, 100, repeat = 5)
+        display.spi = DMALatencySPI(baudrate)
+        pipelined = timeit(display.chars, text, 0, 100, repeat = 5)
+        print('{:<8} {:>10} {:>12} {:>12}'.format(font.__name__.split('.')[-1],
+            baudrate, blocking, pipelined))
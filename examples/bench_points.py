@@ -0,0 +1,45 @@
+# points per second: a pixel() call per point compared with plot_points,
+# which merges the points into runs sent in one transaction
+# MIT License
+
+from array import array
+from math import sin
+from random import getrandbits
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+
+from benchutil import count, timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+color = color565(0, 255, 0)
+
+def pixels(xs, ys):
+    for i in range(len(xs)):
+        display.pixel(xs[i], ys[i], color)
+
+def points(xs, ys):
+    display.plot_points(xs, ys, color)
+
+# a trace with a point per column, a row of dots and a random scatter
+n = display.width
+sets = (
+    ('trace', array('H', range(n)),
+        array('H', [160 + int(100 * sin(x / 20)) for x in range(n)])),
+    ('dots', array('H', range(0, n, 2)), array('H', [100] * (n // 2))),
+    ('scatter', array('H', [getrandbits(16) % n for i in range(500)]),
+        array('H', [getrandbits(16) % display.height for i in range(500)])),
+)
+
+print('{:<8} {:>6} {:>8} {:>8} {:>10} {:>10}'.format('points', 'n',
+    'px trans', 'pt trans', 'px pts/s', 'pt pts/s'))
+for name, xs, ys in sets:
+    old = count(display, pixels, xs, ys).transactions
+    new = count(display, points, xs, ys).transactions
+    t_old = timeit(pixels, xs, ys, repeat = 5)
+    t_new = timeit(points, xs, ys, repeat = 5)
+    print('{:<8} {:>6} {:>8} {:>8} {:>10} {:>10}'.format(name, len(xs),
+        old, new, len(xs) * 1000000 // max(1, t_old),
+        len(xs) * 1000000 // max(1, t_new)))
@@ -0,0 +1,87 @@
+# address windows and bytes per shape, drawn by the primitives module as
+# runs compared with a pixel() call for every pixel of the same shape, and
+# checks that outlines of empty sizes draw nothing, as the fills do
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+import ili9341.primitives as primitives
+
+from benchutil import count
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+color = color565(255, 255, 0)
+
+# count the address windows opened, pixel() included
+windows = [0]
+window = display._window
+def counting_window(spi, x0, y0, x1, y1):
+    windows[0] += 1
+    window(spi, x0, y0, x1, y1)
+display._window = counting_window
+
+class Pixels:
+    # stands in for the display to collect the pixels of a shape
+    width = display.width
+    height = display.height
+
+    def __init__(self):
+        self.pixels = set()
+
+    def fill_rectangles(self, rects, color):
+        for x, y, w, h in rects:
+            for iy in range(y, y + h):
+                for ix in range(x, x + w):
+                    if 0 <= ix < self.width and 0 <= iy < self.height:
+                        self.pixels.add((ix, iy))
+
+def pixel_loop(pixels):
+    for x, y in pixels:
+        display.pixel(x, y, color)
+
+def measure(fn, *args):
+    windows[0] = 0
+    c = count(display, fn, *args)
+    return windows[0], c.nbytes
+
+shapes = (
+    ('hline', primitives.hline, (20, 50, 200)),
+    ('line 45', primitives.line, (0, 60, 150, 210)),
+    ('line flat', primitives.line, (0, 70, 239, 110)),
+    ('circle', primitives.circle, (120, 160, 50)),
+    ('fill_circle', primitives.fill_circle, (120, 160, 50)),
+    ('round_rect', primitives.round_rect, (40, 220, 160, 60, 12)),
+    ('fill_round_rect', primitives.fill_round_rect, (40, 220, 160, 60, 12)),
+    ('triangle', primitives.triangle, (20, 20, 220, 60, 90, 150)),
+    ('fill_triangle', primitives.fill_triangle, (20, 20, 220, 60, 90, 150)),
+    ('fill_polygon', primitives.fill_polygon,
+        ([(120, 20), (150, 110), (230, 110), (165, 160), (190, 250),
+        (120, 195), (50, 250), (75, 160), (10, 110), (90, 110)],)),
+)
+
+print('{:<16} {:>8} {:>8} {:>8} {:>8}'.format('shape', 'px win', 'px bytes',
+    'run win', 'run byte'))
+for name, fn, args in shapes:
+    p = Pixels()
+    fn(p, *args, color)
+    old = measure(pixel_loop, p.pixels)
+    new = measure(fn, display, *args, color)
+    print('{:<16} {:>8} {:>8} {:>8} {:>8}'.format(name, old[0], old[1],
+        new[0], new[1]))
+
+# rectangles of zero or negative width or height
+print()
+for name, fn, args in (
+        ('rect 0x5', primitives.rect, (10, 10, 0, 5)),
+        ('rect 5x-2', primitives.rect, (10, 10, 5, -2)),
+        ('round_rect 0x20', primitives.round_rect, (10, 10, 0, 20, 4)),
+        ('round_rect -2x20', primitives.round_rect, (10, 10, -2, 20, 4)),
+        ('fill_round_rect 0x20', primitives.fill_round_rect, (10, 10, 0, 20, 4)),
+        ('fill_round_rect -2x20', primitives.fill_round_rect,
+            (10, 10, -2, 20, 4))):
+    p = Pixels()
+    fn(p, *args, color)
+    print('{:<24} {}'.format(name, 'ok' if not p.pixels else
+        'FAILED, {} pixels'.format(len(p.pixels))))
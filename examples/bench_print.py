@@ -0,0 +1,52 @@
+# word wrapped text: one chars() call per word, as print used to draw it,
+# compared with print's one window per line, with and without the layout
+# cache. print also clears the rest of every row, which the per word loop
+# left alone, so it sends more bytes in fewer transactions
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341
+from ili9341.fonts import tt14, verdana16
+
+from benchutil import count, timeit
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+text = ('The quick brown fox jumps over the lazy dog. Pack my box with '
+    'five dozen liquor jugs. How vexingly quick daft zebras jump!\n'
+    'Sphinx of black quartz, judge my vow.')
+
+def per_word(text):
+    # the previous print loop
+    d = display
+    font = d._font
+    cury = d._y; curx = d._x
+    char_h = font.height()
+    for line in text.split('\n'):
+        for word in line.split(' '):
+            if curx + font.get_width(word) >= d.width:
+                curx = d._x; cury = d.next_line(cury, char_h)
+            if len(word) > 0:
+                curx = d.chars(word + ' ', curx, cury)
+        curx = d._x; cury = d.next_line(cury, char_h)
+
+def run(fn):
+    display.set_pos(0, 0)
+    fn(text)
+
+print('{:<10} {:>11} {:>11} {:>10} {:>10} {:>10}'.format('font',
+    'words tr/KB', 'lines tr/KB', 'words us', 'lines us', 'cached us'))
+for font in (tt14, verdana16):
+    display.set_font(font)
+    c = count(display, run, per_word)
+    old = '{}/{}'.format(c.transactions, c.nbytes // 1024)
+    c = count(display, run, display.print)
+    new = '{}/{}'.format(c.transactions, c.nbytes // 1024)
+    t_old = timeit(run, per_word, repeat = 5)
+    t_new = timeit(run, display.print, repeat = 5)
+    display.layout_cache()
+    t_cached = timeit(run, display.print, repeat = 5)
+    display.layout_cache(0)
+    print('{:<10} {:>11} {:>11} {:>10} {:>10} {:>10}'.format(
+        font.__name__.split('.')[-1], old, new, t_old, t_new, t_cached))
@@ -0,0 +1,34 @@
+# counts SPI transactions (CS assertions) per draw call
+# MIT License
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+from ili9341.constants import CHUNK
+from ili9341.fonts import tt14
+
+from benchutil import count
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+display.erase()
+display.set_font(tt14)
+
+def legacy(npixels):
+    # the old transport opened one transaction per command and one per
+    # parameter block: CASET and PASET took two each, RAMWR one, then one
+    # per pixel chunk
+    chunks, rest = divmod(npixels, CHUNK)
+    return 5 + chunks + (1 if rest else 0)
+
+cases = (
+    ('fill 3x3', 9, display.fill_rectangle, 10, 10, 3, 3, color565(255, 0, 0)),
+    ('fill 240x40', 240 * 40, display.fill_rectangle, 0, 40, 240, 40, color565(0, 0, 255)),
+    ('chars "TC1"', tt14.get_width('TC1') * tt14.height(), display.chars, 'TC1', 10, 100),
+    ('erase', 240 * 320, display.erase),
+)
+
+print('{:<14} {:>8} {:>8} {:>8}'.format('call', 'before', 'after', 'bytes'))
+for case in cases:
+    name, npixels, fn, args = case[0], case[1], case[2], case[3:]
+    c = count(display, fn, *args)
+    print('{:<14} {:>8} {:>8} {:>8}'.format(name, legacy(npixels), c.transactions, c.nbytes))
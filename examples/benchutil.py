@@ -0,0 +1,136 @@
+# helpers shared by the benchmark scripts in this directory
+# MIT License
+
+from time import ticks_us, ticks_diff, ticks_add
+
+
+class CountingSPI:
+    """ Wraps a HWSPI bus and counts transactions, writes and bytes. """
+
+    def __init__(self, spi):
+        self.spi = spi
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.writes = 0
+        self.nbytes = 0
+
+    def __enter__(self):
+        self.transactions += 1
+        self.spi.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.spi.__exit__(*args)
+
+    def write(self, buf):
+        self.writes += 1
+        self.nbytes += len(buf)
+        self.spi.write(buf)
+
+    def read(self, nbytes, *args):
+        return self.spi.read(nbytes, *args)
+
+    def readinto(self, buf, *args):
+        return self.spi.readinto(buf, *args)
+
+
+def count(display, fn, *args):
+    """ Run fn(*args) once with display.spi wrapped, return the counter. """
+    spi = display.spi
+    counter = CountingSPI(spi)
+    display.spi = counter
+    try:
+        fn(*args)
+    finally:
+        display.spi = spi
+    return counter
+
+
+def timeit(fn, *args, repeat = 20):
+    """ Average run time of fn(*args) in microseconds. """
+    start = ticks_us()
+    for i in range(repeat):
+        fn(*args)
+    return ticks_diff(ticks_us(), start) // repeat
+
+
+try:
+    from gc import mem_alloc
+
+    def _start():
+        return mem_alloc()
+
+    def _since(before):
+        # with the collector off nothing is freed, the count only grows
+        return mem_alloc() - before
+except ImportError:
+    # CPython stand-in, where temporaries are freed at once: take the peak
+    # above the memory in use at the start of the call
+    import tracemalloc
+    tracemalloc.start()
+
+    def _start():
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def _since(before):
+        return tracemalloc.get_traced_memory()[1] - before
+
+
+def allocated(fn, *args, repeat = 100):
+    """ Average heap bytes allocated per fn(*args) call, after a warm-up
+    call and with the collector held off. """
+    import gc
+    fn(*args)
+    gc.collect()
+    gc.disable()
+    try:
+        total = 0
+        for i in range(repeat):
+            before = _start()
+            fn(*args)
+            total += _since(before)
+        return total // repeat
+    finally:
+        gc.enable()
+
+
+class LatencySPI:
+    """ Stand-in bus that sends nothing and only takes the time the
+    transfer would take at the given baud rate. """
+
+    def __init__(self, baudrate):
+        self.baudrate = baudrate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def _duration(self, buf):
+        return len(buf) * 8000000 // self.baudrate
+
+    def _spin(self, deadline):
+        while ticks_diff(deadline, ticks_us()) > 0:
+            pass
+
+    def write(self, buf):
+        self._spin(ticks_add(ticks_us(), self._duration(buf)))
+
+
+class DMALatencySPI(LatencySPI):
+    """ LatencySPI with non-blocking writes: write_nb() returns at once and
+    wait() spins until the simulated transfer has finished. """
+
+    def __init__(self, baudrate):
+        super().__init__(baudrate)
+        self._deadline = ticks_us()
+
+    def write_nb(self, buf):
+        self._deadline = ticks_add(ticks_us(), self._duration(buf))
+
+    def wait(self):
+        self._spin(self._deadline)
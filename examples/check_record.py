@@ -0,0 +1,43 @@
+# checks that draw calls made between record() and flush() come out in
+# the order they were made, read back from the panel
+# MIT License
+
+from framebuf import FrameBuffer, MONO_HLSB
+
+from hwspi.hwspi import VSPI
+
+from ili9341 import ILI9341, color565
+
+display = ILI9341(busid = VSPI, cs = 22, dc = 21)
+red = color565(255, 0, 0)
+white = color565(255, 255, 255)
+black = color565(0, 0, 0)
+
+# an 8x8 block of set bits
+block = FrameBuffer(bytearray(b'\xff' * 8), 8, 8, MONO_HLSB)
+
+def colors(x, y, w, h):
+    buf = display.read_region(x, y, w, h, bytearray(w * h * 2))
+    return set(buf[i] << 8 | buf[i + 1] for i in range(0, len(buf), 2))
+
+def check(name, ok):
+    print('{:<32} {}'.format(name, 'ok' if ok else 'FAILED'))
+
+for band in (0, 16):
+    display.set_color(white, black)
+    display.erase()
+    display.record()
+    display.fill_rectangle(0, 0, 16, 16, red)
+    display.blit(block, 4, 4, 8, 8)
+    display.flush(band)
+    name = 'blit over fill, band {}'.format(band)
+    check(name, colors(4, 4, 8, 8) == {white} and
+        colors(0, 0, 16, 4) == {red} and colors(0, 12, 16, 4) == {red})
+
+    # a blit recorded first is covered by the later fill
+    display.erase()
+    display.record()
+    display.blit(block, 4, 4, 8, 8)
+    display.fill_rectangle(0, 0, 16, 16, red)
+    display.flush(band)
+    check('fill over blit, band {}'.format(band), colors(0, 0, 16, 16) == {red})
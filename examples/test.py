@@ -4,6 +4,7 @@
 from hwspi.hwspi import VSPI
 
 from ili9341 import ILI9341, color565
+from ili9341.label import Label
 from ili9341.fonts import tt14
 from ili9341.fonts import glcdfont
 from ili9341.fonts import tt14
@@ -29,3 +30,9 @@ x_extra = display._font.get_width(' ')
 x_tc1 = display.chars('TC1', 10, 302) + x_extra
 x_tc2 = display.chars('TC2', 90, 302) + x_extra
 x_tc3 = display.chars('TC3', 170, 302) + x_extra
+
+# readouts next to the headings, only changed digits are redrawn
+readouts = [Label(display, x, 302) for x in (x_tc1, x_tc2, x_tc3)]
+for t in range(200, 300):
+    for i in range(3):
+        readouts[i].update('{:.1f}'.format((t + i * 7) / 10))
@@ -6,6 +6,7 @@ CHUNK = const(1024)
 
 #   Miscelleanous Default Settings
 DEFAULT_BAUDRATE = const(50000000)  # Default Baud Rate
+READ_BAUDRATE    = const(6000000)   # Fastest Clock for Reading GRAM Back
 DEFAULT_HEIGHT   = const(320)       # Default TFT Height
 DEFAULT_WIDTH    = const(240)       # Default TFT Width
 DEFAULT_CS_PIN   = const(22)        # Default Pin for TFT SPI Chip Select
@@ -14,6 +15,7 @@ DEFAULT_RST_PIN  = None             # Default Pin for TFT Reset
 DEFAULT_MADCTL   = const(0x88)      # Default Memory Access Control
                                     #  This Controls Mirroring / Flipping
                                     #  of the Display
+MADCTL_MV        = const(0x20)      # MADCTL Row / Column Exchange bit
 
 #   IlI9341 registers definitions
 
@@ -0,0 +1,78 @@
+# Dirty region tracking for the ILI9341 driver
+# MIT License
+
+# bytes on the wire for CASET, PASET and RAMWR with their parameters
+WINDOW_BYTES = 11
+
+
+class DirtyRegion:
+    """ Collects damaged rectangles and reduces them to a small set of
+    windows to repaint.
+
+    Each window is charged overhead bytes for being opened plus 2 bytes per
+    pixel. Two windows are replaced by their bounding box whenever that
+    does not cost more than sending both, so nearby or overlapping damage
+    ends up in one window while distant damage stays separate. overhead
+    defaults to an estimate of the per window cost of the Python drawing
+    path at the default baud rate, expressed in bytes. """
+
+    def __init__(self, overhead = 256, max_windows = 16):
+        self.overhead = overhead
+        self.max_windows = max_windows
+        self.rects = []
+
+    def clear(self):
+        self.rects = []
+
+    def add(self, x0, y0, x1, y1):
+        """ Mark the inclusive rectangle x0, y0 - x1, y1 as damaged. """
+        for r in self.rects:
+            if r[0] <= x0 and r[1] <= y0 and r[2] >= x1 and r[3] >= y1:
+                return
+        self.rects.append([x0, y0, x1, y1])
+        if len(self.rects) > self.max_windows:
+            self._merge(True)
+
+    def _gain(self, a, b):
+        # bytes saved by sending the bounding box of a and b instead of both
+        bbox = ((max(a[2], b[2]) - min(a[0], b[0]) + 1) *
+            (max(a[3], b[3]) - min(a[1], b[1]) + 1))
+        area_a = (a[2] - a[0] + 1) * (a[3] - a[1] + 1)
+        area_b = (b[2] - b[0] + 1) * (b[3] - b[1] + 1)
+        return self.overhead + 2 * (area_a + area_b - bbox)
+
+    def _merge(self, once = False):
+        # merge the best pair until nothing pays off; once forces a single
+        # merge of the cheapest pair to stay within max_windows
+        rects = self.rects
+        while len(rects) > 1:
+            best = None
+            for i in range(len(rects) - 1):
+                for j in range(i + 1, len(rects)):
+                    gain = self._gain(rects[i], rects[j])
+                    if best is None or gain > best:
+                        best = gain
+                        bi = i
+                        bj = j
+            if best < 0 and not once:
+                return
+            a = rects[bi]
+            b = rects.pop(bj)
+            a[0] = min(a[0], b[0])
+            a[1] = min(a[1], b[1])
+            a[2] = max(a[2], b[2])
+            a[3] = max(a[3], b[3])
+            if once:
+                return
+
+    def windows(self):
+        """ The damaged area as a list of [x0, y0, x1, y1] windows. """
+        self._merge()
+        return self.rects
+
+    def cost(self):
+        """ Bytes needed to repaint windows(), window setup included. """
+        total = 0
+        for r in self.windows():
+            total += WINDOW_BYTES + 2 * (r[2] - r[0] + 1) * (r[3] - r[1] + 1)
+        return total
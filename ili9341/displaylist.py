@@ -0,0 +1,132 @@
+# Retained display list for the ILI9341 driver
+# MIT License
+
+from micropython import const
+
+# operation kinds
+FILL   = const(0)
+CHARS  = const(1)
+BITMAP = const(2)
+PIXEL  = const(3)
+IMAGE  = const(4)
+FILE   = const(5)
+BLIT   = const(6)
+
+# operation fields
+KIND   = const(0)
+X0     = const(1)
+Y0     = const(2)
+X1     = const(3)
+Y1     = const(4)
+COLOR  = const(5)   # effective fill color, None for other kinds
+ARGS   = const(6)   # arguments of the original call, None for fills
+CMAP   = const(7)   # colormap at record time
+FONT   = const(8)   # font at record time
+
+
+def clip(x, y, w, h, width, height):
+    """ Screen rectangle actually drawn for a fill/blit at x, y, w, h,
+    clamped the same way the driver does. Returns x0, y0, x1, y1. """
+    x = min(width - 1, max(0, x))
+    y = min(height - 1, max(0, y))
+    w = min(width - x, max(1, w))
+    h = min(height - y, max(1, h))
+    return x, y, x + w - 1, y + h - 1
+
+
+def _contains(a, b):
+    return (a[X0] <= b[X0] and a[Y0] <= b[Y0] and
+        a[X1] >= b[X1] and a[Y1] >= b[Y1])
+
+
+def _intersects(a, b):
+    return (a[X0] <= b[X1] and b[X0] <= a[X1] and
+        a[Y0] <= b[Y1] and b[Y0] <= a[Y1])
+
+
+def _union(a, b):
+    # bounding box of two fills if it is covered exactly by them, else None
+    if a[X0] == b[X0] and a[X1] == b[X1]:
+        if a[Y0] <= b[Y1] + 1 and b[Y0] <= a[Y1] + 1:
+            return a[X0], min(a[Y0], b[Y0]), a[X1], max(a[Y1], b[Y1])
+    elif a[Y0] == b[Y0] and a[Y1] == b[Y1]:
+        if a[X0] <= b[X1] + 1 and b[X0] <= a[X1] + 1:
+            return min(a[X0], b[X0]), a[Y0], max(a[X1], b[X1]), a[Y1]
+    if _contains(a, b):
+        return a[X0], a[Y0], a[X1], a[Y1]
+    if _contains(b, a):
+        return b[X0], b[Y0], b[X1], b[Y1]
+    return None
+
+
+class DisplayList:
+    """ Draw operations recorded between ILI9341.record() and flush().
+    Every operation paints its whole rectangle (text and bitmaps include
+    their background), so anything completely covered by a later operation
+    can be dropped. """
+
+    def __init__(self):
+        self.ops = []
+
+    def add(self, kind, rect, color, args, colormap, font):
+        self.ops.append([kind, rect[0], rect[1], rect[2], rect[3], color,
+            args, bytes(colormap), font])
+
+    def cull(self):
+        # drop operations hidden by a single later operation
+        ops = self.ops
+        keep = []
+        for i in range(len(ops)):
+            op = ops[i]
+            for j in range(i + 1, len(ops)):
+                if _contains(ops[j], op):
+                    break
+            else:
+                keep.append(op)
+        self.ops = keep
+
+    def _movable(self, i, j, rect):
+        # True if nothing between i and j overlaps rect
+        ops = self.ops
+        for k in range(i + 1, j):
+            if _intersects(ops[k], rect):
+                return False
+        return True
+
+    def merge(self):
+        # combine same color fills whose union is a rectangle. The merged
+        # fill takes the place of the later one if nothing drawn in between
+        # overlaps the earlier one, or the earlier place in the mirror case
+        ops = self.ops
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(ops)):
+                a = ops[i]
+                if a[KIND] != FILL:
+                    continue
+                for j in range(i + 1, len(ops)):
+                    b = ops[j]
+                    if b[KIND] != FILL or b[COLOR] != a[COLOR]:
+                        continue
+                    rect = _union(a, b)
+                    if rect is None:
+                        continue
+                    if self._movable(i, j, a):
+                        keep, drop = b, i
+                    elif self._movable(i, j, b):
+                        keep, drop = a, j
+                    else:
+                        continue
+                    keep[X0], keep[Y0], keep[X1], keep[Y1] = rect
+                    del ops[drop]
+                    merged = True
+                    break
+                if merged:
+                    break
+
+    def optimize(self):
+        self.cull()
+        self.merge()
+        self.cull()
+        return self.ops
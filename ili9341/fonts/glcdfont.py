@@ -284,6 +284,12 @@ _mvfont = memoryview(_font)
 def get_width(s):
     return len(s)*6
 
+def prefix_widths(s):
+    return list(range(0, len(s)*6 + 1, 6))
+
+def fit(s, width, start = 0):
+    return max(0, min(len(s) - start, width//6))
+
 def get_ch(ch): 
     ordch = ord(ch)
     offset = ordch*5
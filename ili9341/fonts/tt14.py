@@ -134,26 +134,51 @@ b'\xee\x04\x00\x05\x14\x05\x26\x05\x30\x05\x42\x05\x4c\x05\x5e\x05'\
 b'\x6e\x05\x84\x05\x94\x05\xa4\x05\xb2\x05\xbe\x05\xc8\x05\xd2\x05'\
 b'\xde\x05'
 
+_widths =\
+b'\x08\x04\x03\x05\x07\x07\x0b\x09\x02\x04\x05\x05\x07\x03\x04\x03'\
+b'\x04\x08\x04\x08\x07\x07\x07\x08\x06\x07\x08\x03\x03\x06\x06\x06'\
+b'\x08\x0b\x08\x08\x09\x09\x08\x07\x0a\x09\x03\x07\x08\x07\x0b\x09'\
+b'\x0a\x09\x0a\x09\x09\x07\x09\x08\x0b\x08\x08\x07\x04\x04\x04\x07'\
+b'\x0a\x05\x08\x09\x07\x08\x07\x04\x08\x08\x03\x03\x07\x03\x0c\x08'\
+b'\x08\x09\x08\x04\x08\x04\x08\x07\x0a\x07\x07\x06\x05\x04\x04\x05'\
+
 _mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - 32)
-    return int.from_bytes(_index[offset:offset + 2], 'little')
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
 
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - 31 if ordch >= 32 and ordch <= 126 else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
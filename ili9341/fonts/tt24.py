@@ -261,26 +261,51 @@ b'\x9e\x0b\xc7\x0b\xf3\x0b\x1f\x0c\x39\x0c\x5f\x0c\x76\x0c\x9f\x0c'\
 b'\xc5\x0c\xfd\x0c\x23\x0d\x49\x0d\x6c\x0d\x86\x0d\x97\x0d\xae\x0d'\
 b'\xcb\x0d'
 
+_widths =\
+b'\x0c\x07\x06\x08\x0c\x0b\x12\x0f\x04\x07\x07\x09\x0c\x05\x07\x05'\
+b'\x08\x0d\x08\x0d\x0c\x0c\x0c\x0d\x0b\x0c\x0d\x05\x05\x0a\x0b\x0a'\
+b'\x0c\x11\x0f\x0f\x10\x0f\x0e\x0d\x11\x0f\x06\x0c\x0e\x0c\x12\x0f'\
+b'\x11\x0e\x11\x0f\x0e\x0c\x0e\x0e\x14\x0e\x0d\x0d\x07\x08\x07\x0c'\
+b'\x12\x09\x0d\x0e\x0d\x0e\x0d\x07\x0e\x0d\x05\x05\x0c\x05\x14\x0d'\
+b'\x0d\x0e\x0e\x08\x0c\x07\x0d\x0c\x12\x0c\x0c\x0b\x08\x05\x07\x09'\
+
 _mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - 32)
-    return int.from_bytes(_index[offset:offset + 2], 'little')
-    
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - 31 if ordch >= 32 and ordch <= 126 else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
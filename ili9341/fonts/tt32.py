@@ -405,26 +405,51 @@ b'\x30\x13\x76\x13\xc0\x13\x06\x14\x30\x14\x6e\x14\x94\x14\xd6\x14'\
 b'\x14\x15\x6e\x15\xac\x15\xea\x15\x24\x16\x4e\x16\x70\x16\x96\x16'\
 b'\xc8\x16'
 
+_widths =\
+b'\x0f\x09\x08\x0a\x0f\x0e\x17\x13\x05\x09\x09\x0b\x0f\x06\x09\x06'\
+b'\x0a\x11\x09\x10\x10\x10\x0f\x10\x0e\x10\x10\x06\x06\x0c\x0e\x0c'\
+b'\x0f\x16\x13\x12\x14\x13\x11\x10\x15\x14\x07\x0f\x12\x10\x18\x14'\
+b'\x16\x12\x15\x12\x12\x0f\x12\x11\x19\x11\x12\x11\x09\x0a\x09\x0f'\
+b'\x17\x0c\x11\x12\x10\x12\x10\x09\x11\x10\x07\x06\x10\x07\x1a\x10'\
+b'\x11\x12\x11\x0a\x0f\x09\x10\x0f\x16\x0f\x0f\x0e\x0a\x08\x09\x0c'\
+
 _mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - 32)
-    return int.from_bytes(_index[offset:offset + 2], 'little')
-    
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - 31 if ordch >= 32 and ordch <= 126 else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
@@ -170,26 +170,51 @@ b'\xcc\x06\xe2\x06\xf8\x06\x0e\x07\x1c\x07\x30\x07\x40\x07\x56\x07'\
 b'\x6a\x07\x86\x07\x9a\x07\xae\x07\xc2\x07\xd8\x07\xe8\x07\xfe\x07'\
 b'\x1a\x08'
 
+_widths =\
+b'\x09\x06\x06\x07\x0d\x0a\x11\x0c\x04\x07\x07\x0a\x0d\x06\x07\x06'\
+b'\x07\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x0a\x07\x07\x0d\x0d\x0d'\
+b'\x09\x10\x0b\x0b\x0b\x0c\x0a\x09\x0c\x0c\x07\x07\x0b\x09\x0d\x0c'\
+b'\x0d\x0a\x0d\x0b\x0a\x0a\x0c\x0b\x11\x0b\x0b\x0b\x07\x07\x07\x0d'\
+b'\x0a\x0a\x0a\x0a\x08\x0a\x0a\x06\x0a\x0a\x05\x06\x09\x05\x0f\x0a'\
+b'\x0a\x0a\x0a\x06\x09\x07\x0a\x09\x0d\x09\x09\x09\x0a\x07\x0a\x0d'\
+
 _mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - 32)
-    return int.from_bytes(_index[offset:offset + 2], 'little')
-    
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - 31 if ordch >= 32 and ordch <= 126 else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
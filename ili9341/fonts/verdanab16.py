@@ -182,26 +182,51 @@ b'\x66\x07\x7e\x07\x96\x07\xae\x07\xc0\x07\xd4\x07\xe4\x07\xfc\x07'\
 b'\x12\x08\x34\x08\x4c\x08\x64\x08\x7a\x08\x92\x08\xa4\x08\xbc\x08'\
 b'\xd8\x08'
 
+_widths =\
+b'\x0a\x05\x06\x09\x0d\x0b\x14\x0e\x06\x09\x09\x0b\x0d\x06\x08\x06'\
+b'\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x0b\x06\x06\x0d\x0d\x0d'\
+b'\x0a\x0f\x0c\x0c\x0c\x0d\x0b\x0a\x0d\x0d\x08\x09\x0c\x0a\x0f\x0d'\
+b'\x0e\x0c\x0e\x0d\x0b\x0c\x0d\x0c\x12\x0c\x0c\x0b\x09\x0b\x09\x0d'\
+b'\x0b\x0b\x0b\x0b\x09\x0b\x0b\x07\x0b\x0b\x04\x06\x0a\x04\x10\x0b'\
+b'\x0b\x0b\x0b\x08\x09\x07\x0b\x0a\x10\x0b\x0b\x0a\x0b\x08\x0b\x0d'\
+
 _mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - 32)
-    return int.from_bytes(_index[offset:offset + 2], 'little')
-    
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - 31 if ordch >= 32 and ordch <= 126 else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= 32 and ordch <= 126 else 32
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - 31 if ordch >= 32 and ordch <= 126 else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
@@ -0,0 +1,45 @@
+# LRU cache of rendered glyphs for the ILI9341 driver
+# MIT License
+
+
+class GlyphCache:
+    """ Ready to send RGB565 glyph blocks, keyed by (font, char, colors),
+    within a byte budget. The least recently used glyphs are evicted
+    first. hits and misses count lookups. """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # key: [block, width, last use]
+        self._tick = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tick += 1
+        entry[2] = self._tick
+        return entry
+
+    def put(self, key, block, width):
+        size = len(block)
+        if size > self.budget:
+            return
+        entries = self._entries
+        while self.used + size > self.budget:
+            oldest = None
+            for k in entries:
+                if oldest is None or entries[k][2] < entries[oldest][2]:
+                    oldest = k
+            self.used -= len(entries.pop(oldest)[0])
+        self._tick += 1
+        entries[key] = [block, width, self._tick]
+        self.used += size
+
+    def clear(self):
+        self._entries = {}
+        self.used = 0
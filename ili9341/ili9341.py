@@ -16,11 +16,26 @@
 from time import sleep_ms
 from ustruct import pack
 from ili9341.fonts import glcdfont
-from framebuf import FrameBuffer, MONO_VLSB
+from framebuf import FrameBuffer, MONO_VLSB, MONO_HLSB, MONO_HMSB, RGB565
 
 from machine import Pin
 
 from ili9341.constants import *
+from ili9341.dirty import DirtyRegion
+from ili9341.glyphcache import GlyphCache
+from ili9341.image import ImageFile
+from ili9341.kernels import build_lut, build_palette
+from ili9341.layout import LayoutCache, measures, wrap
+try:
+    from ili9341.kernels_viper import (bits, fill, transpose, rgb666_to_565,
+        vrow, indexed)
+except (ImportError, SyntaxError, ValueError, AttributeError, TypeError):
+    # no native emitter on this port, .mpy built for another arch or a
+    # stand-in micropython module
+    from ili9341.kernels import (bits, fill, transpose, rgb666_to_565,
+        vrow, indexed)
+from ili9341.displaylist import (DisplayList, clip, FILL, CHARS, BITMAP,
+    PIXEL, IMAGE, FILE, BLIT, KIND, X0, Y0, X1, Y1, COLOR, ARGS, CMAP, FONT)
 from hwspi.hwspi import HWSPI
 
 
@@ -28,9 +43,11 @@ class ILI9341:
 
     def __init__(self, busid, cs, dc, rst = None, baudrate = DEFAULT_BAUDRATE,
         height = DEFAULT_HEIGHT, width = DEFAULT_WIDTH,
-        madctl = DEFAULT_MADCTL, **kwargs):
+        madctl = DEFAULT_MADCTL, read_baudrate = READ_BAUDRATE, **kwargs):
         """ Setup and Initialize Display. """
         self.spi = HWSPI(busid = busid, cs = cs, baudrate = baudrate, **kwargs)
+        self.baudrate = baudrate
+        self.read_baudrate = read_baudrate
 
         if dc is None:
             raise RuntimeError('ILI9341 must be initialized with a dc pin number')
@@ -43,17 +60,57 @@ class ILI9341:
         self.height = height
         self.width = width
         self.madctl = pack('>B', madctl)
+        self._madctl_mv = pack('>B', madctl ^ MADCTL_MV)
+
+        # preallocated command, parameter and pixel buffers, filled in place
+        self._cmd = bytearray(1)
+        self._args = bytearray(4)
+        self._arg = bytearray(2)
+        self._buf = bytearray(CHUNK * 2)
+        self._mv = memoryview(self._buf)
+        self._tail_len = -1
+        self._tail_mv = None
+        self._back = None   # second pixel buffer, only for non-blocking buses
+        self._back_mv = None
+        self._rbuf = None   # readback buffer, allocated on first read
+        # what the pixel buffer holds for fills: [view, pixels filled, -,
+        # tail view, color], see _fill_entry()
+        self._fill_main = [self._mv, 0, 0, None, -1]
+        self._fills = None  # prefilled buffers by color, see fill_cache()
+        self._fill_tick = 0
+        self._text = bytearray(0)
+        self._text_fb = None
+        self._hbuf = bytearray(0)   # blit source converted to MONO_HLSB
+        self._lut = [None, None]    # byte to 8 pixel tables, see _expansion()
+        self._lut_cmap = [bytearray(4), bytearray(4)]
+        self._pal_lut = None        # palette table, see _palette_lut()
+        self._pal_colors = ()
+        self._pal_depth = 0
+        self.glyphs = None          # GlyphCache, see glyph_cache()
+        self.layouts = None         # LayoutCache, see layout_cache()
+        self._columns = False       # see column_text()
 
         self.reset()
         self.init()
 
         self._scroll = 0
-        self._buf = bytearray(CHUNK * 2)
+        self._top = 0       # fixed rows above and below the scrolling area
+        self._bottom = 0
         self._colormap = bytearray(b'\x00\x00\xFF\xFF') #default white foregraound, black background
         self._x = 0
         self._y = 0
         self._font = glcdfont
         self.scrolling = False
+        self._dlist = None
+        self._fb = None
+        self._fy = 0        # screen row of the shadow buffer's first row
+        self._fh = self.height  # and the number of rows it holds
+        self._shadow = None
+        self._region = DirtyRegion()
+        self._band = None
+        # the colormap read as two little endian RGB565 pixels is the
+        # byte-swapped background and foreground
+        self._palette = FrameBuffer(self._colormap, 2, 1, RGB565)
     
     def set_color(self, fg, bg):
         self._colormap[0] = bg>>8
@@ -99,6 +156,7 @@ class ILI9341:
         sleep_ms(120)
         self._write(DISPON)
         sleep_ms(50)
+        self._invalidate_window()
 
     def reset(self):
         if self.rst is None:
@@ -113,164 +171,999 @@ class ILI9341:
 
     def _write(self, command, data = None):
         with self.spi as spi:
-            self.dc(0)
-            spi.write(bytearray([command]))
+            self._command(spi, command, data)
+
+    def _command(self, spi, command, data = None):
+        # send a command (and its parameters) inside an open transaction
+        self._cmd[0] = command
+        self.dc(0)
+        spi.write(self._cmd)
         if data is not None:
-            self._data(data)
+            self.dc(1)
+            spi.write(data)
 
     def _data(self, data):
         with self.spi as spi:
             self.dc(1)
             spi.write(data)
 
+    def _words(self, a, b):
+        # two big endian 16 bit parameters in the shared parameter buffer
+        args = self._args
+        args[0] = a >> 8
+        args[1] = a & 255
+        args[2] = b >> 8
+        args[3] = b & 255
+        return args
+
+    def _word(self, a):
+        arg = self._arg
+        arg[0] = a >> 8
+        arg[1] = a & 255
+        return arg
+
+    def _tail(self, nbytes):
+        # view on the head of the pixel buffer, kept while the same length
+        # keeps coming back so steady state redraws don't allocate
+        if nbytes != self._tail_len:
+            self._tail_mv = self._mv[:nbytes]
+            self._tail_len = nbytes
+        return self._tail_mv
+
+    def _flip(self, spi, nbytes):
+        # hand the first nbytes of the pixel buffer to the bus. A backend
+        # with write_nb()/wait() starts the transfer and returns; filling then
+        # goes on in the second buffer while the first one is on the wire.
+        # Either way the buffer no longer holds a fill
+        self._fill_main[1] = 0
+        if not hasattr(spi, 'write_nb'):
+            spi.write(self._buf if nbytes == CHUNK * 2 else self._tail(nbytes))
+            return
+        if self._back is None:
+            self._back = bytearray(CHUNK * 2)
+            self._back_mv = memoryview(self._back)
+        spi.wait()
+        spi.write_nb(self._buf if nbytes == CHUNK * 2 else self._mv[:nbytes])
+        self._buf, self._back = self._back, self._buf
+        self._mv, self._back_mv = self._back_mv, self._mv
+        self._tail_len = -1
+
+    def _drain(self, spi):
+        # wait for a pending non-blocking transfer before CS is released
+        if hasattr(spi, 'wait'):
+            spi.wait()
+
+    def _invalidate_window(self):
+        # forget the address window held by the controller
+        self._wx0 = self._wx1 = self._wy0 = self._wnext = -1
+
+    def _address(self, spi, x0, y0, x1):
+        # CASET/PASET, skipping whichever the controller already holds. The
+        # page range is opened to the bottom of the screen so the window is
+        # reusable for any height below y0
+        if x0 != self._wx0 or x1 != self._wx1:
+            self._command(spi, CASET, self._words(x0, x1))
+            self._wx0 = x0
+            self._wx1 = x1
+        if y0 != self._wy0:
+            self._command(spi, PASET, self._words(y0, self.height - 1))
+            self._wy0 = y0
+
+    def _window(self, spi, x0, y0, x1, y1):
+        # set the address window and start a memory write without releasing
+        # CS, DC is left high so pixel data can follow directly. Callers
+        # always fill the whole window, so a window starting on the row right
+        # below the previous one continues with RAMWCONT
+        if y0 == self._wnext and x0 == self._wx0 and x1 == self._wx1:
+            self._command(spi, RAMWCONT)
+        else:
+            self._address(spi, x0, y0, x1)
+            self._command(spi, RAMWR)
+        self._wnext = y1 + 1
+        self.dc(1)
+
     def _writeblock(self, x0, y0, x1, y1, data = None):
-        self._write(CASET, pack(">HH", x0, x1))
-        self._write(PASET, pack(">HH", y0, y1))
-        self._write(RAMWR, data)
+        with self.spi as spi:
+            self._window(spi, x0, y0, x1, y1)
+            if data is not None:
+                spi.write(data)
+
+    def read_region(self, x, y, w, h, buf):
+        """ Read a screen area back into buf as big endian RGB565, the same
+        format the drawing calls send. buf must hold w * h * 2 bytes. The
+        controller answers with 3 bytes per pixel and only up to a clock
+        well below what it accepts for writes, so a bus with init() is
+        switched to read_baudrate for the read and back afterwards. Other
+        buses must already run slow enough. """
+        if x < 0 or y < 0 or w < 1 or h < 1 or x + w > self.width or y + h > self.height:
+            raise ValueError('region outside the screen')
+        if self._fb is not None:
+            # the shadow buffer already holds the pixels in this format
+            mv = memoryview(self._shadow)
+            stride = self.width * 2
+            for row in range(h):
+                start = (y + row) * stride + x * 2
+                buf[row * w * 2:(row + 1) * w * 2] = mv[start:start + w * 2]
+            return buf
+        if self._rbuf is None:
+            self._rbuf = bytearray(CHUNK * 3)
+        rbuf = self._rbuf
+        rmv = memoryview(rbuf)
+        npix = w * h
+        done = 0
+        slow = hasattr(self.spi, 'init')
+        if slow:
+            self.spi.init(baudrate = self.read_baudrate)
+        try:
+            with self.spi as spi:
+                self._address(spi, x, y, x + w - 1)
+                self._command(spi, RAMRD)
+                self.dc(1)
+                spi.readinto(rmv[:1])   # dummy byte
+                # CS stays low, so the controller keeps streaming from where
+                # the previous chunk ended
+                while done < npix:
+                    n = min(CHUNK, npix - done)
+                    spi.readinto(rbuf if n == CHUNK else rmv[:n * 3])
+                    rgb666_to_565(rbuf, buf, done * 2, n)
+                    done += n
+        finally:
+            if slow:
+                self.spi.init(baudrate = self.baudrate)
+        self._wnext = -1
+        return buf
+
+    def record(self):
+        """ Start recording fill_rectangle, chars, bitmap, blit, image and
+        pixel calls into a display list instead of drawing them. Hardware
+        scrolling is not recorded. """
+        if self._dlist is None:
+            self._dlist = DisplayList()
+
+    def flush(self, band = 0):
+        """ Stop recording and draw the display list, with hidden
+        operations dropped and adjacent same color fills merged.
+
+        With band > 0 the list is instead rendered band rows at a time into
+        a small RGB565 strip buffer that is sent with one window per strip,
+        so the frame appears without intermediate states. Strips cover the
+        full width between the top and bottom of the recorded operations;
+        pixels no operation draws come out in the background color. """
+        dlist = self._dlist
+        if dlist is None:
+            return
+        self._dlist = None
+        ops = dlist.optimize()
+        if band > 0:
+            self._replay_banded(ops, band)
+        else:
+            self._replay(ops)
+
+    def _replay_banded(self, ops, band):
+        if not ops:
+            return
+        top = min(op[Y0] for op in ops)
+        bottom = max(op[Y1] for op in ops)
+        band = min(band, bottom - top + 1)
+        size = self.width * band * 2
+        if self._band is None or len(self._band) != size:
+            self._band = bytearray(size)
+        mv = memoryview(self._band)
+        fb = FrameBuffer(self._band, self.width, band, RGB565)
+        # strips are sent whole, keep the shadow buffer's damage apart
+        state = self._fb, self._fy, self._fh, self._region.rects
+        self._region.rects = []
+        bg = self._colormap[1] << 8 | self._colormap[0]
+        self._fb = fb
+        try:
+            for y0 in range(top, bottom + 1, band):
+                y1 = min(y0 + band, bottom + 1) - 1
+                self._fy = y0
+                self._fh = y1 - y0 + 1
+                fb.fill(bg)
+                self._replay([op for op in ops if op[Y0] <= y1 and op[Y1] >= y0])
+                self._writeblock(0, y0, self.width - 1, y1,
+                    mv[:(y1 - y0 + 1) * self.width * 2])
+        finally:
+            self._fb, self._fy, self._fh, self._region.rects = state
+
+    def _replay(self, ops):
+        colormap = bytes(self._colormap)
+        font = self._font
+        for op in ops:
+            self._colormap[:] = op[CMAP]
+            self._font = op[FONT]
+            kind = op[KIND]
+            if kind == FILL:
+                self.fill_rectangle(op[X0], op[Y0], op[X1] - op[X0] + 1,
+                    op[Y1] - op[Y0] + 1, op[COLOR])
+            elif kind == CHARS:
+                self.chars(*op[ARGS])
+            elif kind == BITMAP:
+                self.bitmap(*op[ARGS])
+            elif kind == IMAGE:
+                self._image(*op[ARGS])
+            elif kind == FILE:
+                self.image(*op[ARGS])
+            elif kind == BLIT:
+                self.blit(*op[ARGS])
+            else:
+                self.pixel(*op[ARGS])
+        self._colormap[:] = colormap
+        self._font = font
+
+    def shadow(self, buf = None):
+        """ Render into a full screen RGB565 shadow buffer from now on and
+        only send what changed on show(). buf may be supplied by the caller
+        (e.g. allocated in PSRAM) and must hold width * height * 2 bytes.
+        Pixels are kept byte-swapped, in controller order. """
+        if buf is None:
+            buf = bytearray(self.width * self.height * 2)
+        self._shadow = buf
+        self._fb = FrameBuffer(buf, self.width, self.height, RGB565)
+
+    def unshadow(self):
+        """ Send pending changes and go back to drawing straight to the
+        display. """
+        self.show()
+        self._fb = None
+        self._shadow = None
+
+    def _damage(self, x0, y0, x1, y1):
+        self._region.add(x0, y0, x1, y1)
 
-    def _readblock(self, x0, y0, x1, y1):
-        self._write(CASET, pack(">HH", x0, x1))
-        self._write(PASET, pack(">HH", y0, y1))
-        if data is None:
-            return self._read(RAMRD, (x1 - x0 + 1) * (y1 - y0 + 1) * 3)
+    def invalidate(self, x, y, w, h):
+        """ Mark a screen area as needing a repaint. """
+        x0, y0, x1, y1 = clip(x, y, w, h, self.width, self.height)
+        self._region.add(x0, y0, x1, y1)
 
-    def _read(self, command, count):
+    def dirty_windows(self):
+        """ Return the invalidated area as a short list of [x0, y0, x1, y1]
+        windows, merged where one window is cheaper than several, and start
+        collecting anew. """
+        windows = self._region.windows()
+        self._region.clear()
+        return windows
+
+    def show(self):
+        """ Send everything drawn into the shadow buffer since the last
+        show(), one window per merged dirty region. """
+        if self._fb is None:
+            return
+        mv = memoryview(self._shadow)
+        stride = self.width * 2
         with self.spi as spi:
-            self.dc(0)
-            spi.write(bytearray([command]))
-            data = spi.read(count)
-        return data
+            for x0, y0, x1, y1 in self.dirty_windows():
+                self._window(spi, x0, y0, x1, y1)
+                if x0 == 0 and x1 == self.width - 1:
+                    spi.write(mv[y0 * stride:(y1 + 1) * stride])
+                else:
+                    for y in range(y0, y1 + 1):
+                        spi.write(mv[y * stride + x0 * 2:y * stride + x1 * 2 + 2])
 
     def pixel(self, x, y, color = None):
         if color is None:
-            r, b, g = self._readblock(x, y, x, y)
-            return color565(r, g, b)
+            if not 0 <= x < self.width or not 0 <= y < self.height:
+                return
+            if self._fb is not None:
+                c = self._fb.pixel(x, y - self._fy)
+                if c is None:
+                    return  # outside the band being rendered
+                return (c & 255) << 8 | c >> 8
+            arg = self.read_region(x, y, 1, 1, self._arg)
+            return arg[0] << 8 | arg[1]
         if not 0 <= x < self.width or not 0 <= y < self.height:
             return
-        self._writeblock(x, y, x, y, pack(">H", color))
+        if self._dlist is not None:
+            self._dlist.add(PIXEL, (x, y, x, y), None, (x, y, color),
+                self._colormap, self._font)
+            return
+        if self._fb is not None:
+            self._fb.pixel(x, y - self._fy, (color & 255) << 8 | color >> 8)
+            self._damage(x, y, x, y)
+            return
+        self._writeblock(x, y, x, y, self._word(color))
 
     def fill_rectangle(self, x, y, w, h, color = None):
+        if self._dlist is not None:
+            if not color:
+                color = self._colormap[0] << 8 | self._colormap[1]
+            self._dlist.add(FILL, clip(x, y, w, h, self.width, self.height),
+                color, None, self._colormap, self._font)
+            return
         x = min(self.width - 1, max(0, x))
         y = min(self.height - 1, max(0, y))
         w = min(self.width - x, max(1, w))
         h = min(self.height - y, max(1, h))
         if color:
-            color = pack(">H", color)
+            hi = color >> 8; lo = color & 255
         else:
-            color = self._colormap[0:2] #background
-        for i in range(CHUNK):
-            self._buf[2*i]=color[0]; self._buf[2*i+1] = color[1]
-        chunks, rest = divmod(w * h, CHUNK)
-        self._writeblock(x, y, x + w - 1, y + h - 1, None)
-        if chunks:
-            for count in range(chunks):
-                self._data(self._buf)
+            hi = self._colormap[0]; lo = self._colormap[1] #background
+        if self._fb is not None:
+            self._fb.fill_rect(x, y - self._fy, w, h, lo << 8 | hi)
+            self._damage(x, y, x + w - 1, y + h - 1)
+            return
+        with self.spi as spi:
+            self._fill(spi, x, y, w, h, hi << 8 | lo)
+
+    def fill_rectangles(self, rects, color = None):
+        """ Fill each x, y, w, h rectangle in rects, all in one
+        transaction. Unlike fill_rectangle the rectangles are clipped to
+        the screen, the parts outside are not drawn. """
+        if not color:
+            color = self._colormap[0] << 8 | self._colormap[1]
+        if self._dlist is not None or self._fb is not None:
+            for x, y, w, h in self._clipped(rects):
+                self.fill_rectangle(x, y, w, h, color)
+            return
+        with self.spi as spi:
+            for x, y, w, h in self._clipped(rects):
+                self._fill(spi, x, y, w, h, color)
+
+    def plot_points(self, xs, ys, color):
+        """ Set the pixels at xs[i], ys[i] (lists or arrays) to color.
+        The points are sorted and merged into runs along rows or along
+        columns, whichever gives fewer, and sent in one transaction, where
+        runs sharing a row or column reuse the address window. """
+        width = self.width
+        height = self.height
+        rows = []
+        cols = []
+        for i in range(len(xs)):
+            x = xs[i]
+            y = ys[i]
+            if 0 <= x < width and 0 <= y < height:
+                rows.append(y * width + x)
+                cols.append(x * height + y)
+        rows.sort()
+        cols.sort()
+        runs = self._runs(rows, width, False)
+        vruns = self._runs(cols, height, True)
+        self.fill_rectangles(runs if len(runs) <= len(vruns) else vruns, color)
+
+    def _runs(self, keys, n, vertical):
+        # x, y, w, h runs of sorted line * n + offset keys, duplicates
+        # dropped and neighbours on the same line merged
+        runs = []
+        last = -2
+        for k in keys:
+            if k == last:
+                continue
+            if k == last + 1 and k % n:
+                run[3 if vertical else 2] += 1
+            else:
+                line, offset = divmod(k, n)
+                run = [line, offset, 1, 1] if vertical else [offset, line, 1, 1]
+                runs.append(run)
+            last = k
+        return runs
+
+    def _clipped(self, rects):
+        # the on screen parts of x, y, w, h rectangles
+        for x, y, w, h in rects:
+            if x < 0:
+                w += x; x = 0
+            if y < 0:
+                h += y; y = 0
+            w = min(w, self.width - x)
+            h = min(h, self.height - y)
+            if w > 0 and h > 0:
+                yield x, y, w, h
+
+    def _fill(self, spi, x, y, w, h, color):
+        # send an on screen rectangle of color inside an open transaction
+        npix = w * h
+        entry = self._fill_entry(color, npix)
+        buf = entry[0]
+        # // and % and a while loop, divmod would allocate a tuple
+        n = len(buf) // 2
+        chunks = npix // n
+        rest = npix % n
+        self._window(spi, x, y, x + w - 1, y + h - 1)
+        while chunks > 0:
+            spi.write(buf)
+            chunks -= 1
         if rest != 0:
-            mv = memoryview(self._buf)
-            self._data(mv[:rest*2])
+            tail = entry[3]
+            if tail is None or len(tail) != rest * 2:
+                tail = entry[3] = buf[:rest * 2]
+            spi.write(tail)
+
+    def fill_cache(self, colors = 4, pixels = 256):
+        """ Keep prefilled buffers for up to colors fill colors, used by
+        fills of at most pixels pixels, so small fills in a few theme
+        colors are sent without filling anything. colors 0 turns the cache
+        off. """
+        self._fills = {} if colors > 0 else None
+        self._fill_colors = colors
+        self._fill_pixels = min(pixels, CHUNK)
+
+    def _fill_entry(self, color, npix):
+        # [view, pixels filled, last use, tail view, color] for a buffer
+        # starting with min(npix, its size) pixels of color. Small fills
+        # take a buffer of their color from the fill cache, the others the
+        # pixel buffer. Only the pixels needed are filled, at least twice
+        # as many as before so growing fills refill rarely
+        fills = self._fills
+        if fills is not None and npix <= self._fill_pixels:
+            self._fill_tick += 1
+            entry = fills.get(color)
+            if entry is None:
+                if len(fills) < self._fill_colors:
+                    buf = memoryview(bytearray(self._fill_pixels * 2))
+                else:
+                    oldest = None
+                    for c in fills:
+                        if oldest is None or fills[c][2] < fills[oldest][2]:
+                            oldest = c
+                    buf = fills.pop(oldest)[0]
+                entry = fills[color] = [buf, 0, 0, None, color]
+            entry[2] = self._fill_tick
+        else:
+            entry = self._fill_main
+            if entry[0] is not self._mv:
+                entry[0] = self._mv
+                entry[1] = 0
+                entry[3] = None
+            if entry[4] != color:
+                entry[1] = 0
+                entry[4] = color
+        if entry[1] < npix:
+            entry[1] = min(len(entry[0]) // 2, max(npix, 2 * entry[1]))
+            fill(entry[0], entry[1], color)
+        return entry
 
     def erase(self):
         self.fill_rectangle(0, 0, self.width, self.height)
         
     def blit(self, bitbuff, x, y, w, h):
+        if self._dlist is not None:
+            self._dlist.add(BLIT, clip(x, y, w, h, self.width, self.height),
+                None, (bitbuff, x, y, w, h), self._colormap, self._font)
+            return
         x = min(self.width - 1, max(0, x))
         y = min(self.height - 1, max(0, y))
         w = min(self.width - x, max(1, w))
         h = min(self.height - y, max(1, h))
-        chunks, rest = divmod(w * h, CHUNK)
-        self._writeblock(x, y, x + w - 1, y + h - 1, None)
-        written = 0
-        for iy in range(h):
-            for ix in range(w):
-                index = ix+iy*w - written
-                if index >= CHUNK:
-                    self._data(self._buf)
-                    written += CHUNK
-                    index   -= CHUNK
-                c = bitbuff.pixel(ix,iy)
-                self._buf[index*2] = self._colormap[c*2]
-                self._buf[index*2+1] = self._colormap[c*2+1]
-        rest = w*h - written
-        if rest != 0:
-            mv = memoryview(self._buf)
-            self._data(mv[:rest*2])
+        if self._fb is not None:
+            self._fb.blit(bitbuff, x, y - self._fy, -1, self._palette)
+            self._damage(x, y, x + w - 1, y + h - 1)
+            return
+        # expand the source a byte at a time, as many whole rows per chunk
+        # as fit
+        hbuf = self._hlsb(bitbuff, w, h)
+        stride = (w + 7) // 8
+        lut = self._expansion()
+        rows = CHUNK // w
+        with self.spi as spi:
+            self._window(spi, x, y, x + w - 1, y + h - 1)
+            iy = 0
+            while iy < h:
+                n = min(rows, h - iy)
+                buf = self._buf
+                for r in range(n):
+                    bits(hbuf, (iy + r) * stride, w, buf, r * w * 2, lut)
+                self._flip(spi, n * w * 2)
+                iy += n
+            self._drain(spi)
+
+    def blit_rgb565(self, buf, x, y, w, h):
+        """ Draw a w x h image of big endian RGB565 pixels, rows top to
+        bottom, at x, y, clipped to the screen. buf (bytes, bytearray or
+        memoryview, frozen bytes in flash too) goes to the bus a chunk at a
+        time without being copied. """
+        self._image(buf, x, y, w, h, None, 16)
+
+    def blit_indexed(self, buf, x, y, w, h, palette, depth = 8):
+        """ Draw a w x h image of depth (2, 4 or 8) bit palette indices at
+        x, y, clipped to the screen. Rows start on a byte with the leftmost
+        pixel in the most significant bits, as in framebuf's GS2_HMSB,
+        GS4_HMSB and GS8. palette is a sequence of RGB565 colors, turned
+        into a table that is kept while the same palette comes back. """
+        if depth not in (2, 4, 8):
+            raise ValueError('depth must be 2, 4 or 8')
+        self._image(buf, x, y, w, h, palette, depth)
+
+    def _image(self, buf, x, y, w, h, palette, depth):
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w) - 1
+        y1 = min(self.height, y + h) - 1
+        if x1 < x0 or y1 < y0:
+            return
+        if self._dlist is not None:
+            self._dlist.add(IMAGE, (x0, y0, x1, y1), None,
+                (buf, x, y, w, h, palette, depth), self._colormap, self._font)
+            return
+        if self._fb is not None:
+            y0, y1 = self._rows_held(y0, y1)
+            if y1 < y0:
+                return
+        src = memoryview(buf)
+        cw = x1 - x0 + 1
+        ch = y1 - y0 + 1
+        sx = x0 - x         # first source column and row drawn
+        sy = y0 - y
+        if depth == 16:
+            lut = None
+            stride = w * 2
+        else:
+            lut = self._palette_lut(palette, depth)
+            stride = (w * depth + 7) // 8
+        rows = CHUNK // cw
+        if self._fb is not None:
+            # framebuf only wraps writable memory, so go through the pixel
+            # buffer
+            self._fill_main[1] = 0
+            for r in range(0, ch, rows):
+                n = min(rows, ch - r)
+                self._image_rows(src, (sy + r) * stride, stride, sx, cw, n,
+                    lut, depth)
+                self._fb.blit(FrameBuffer(self._buf, cw, n, RGB565), x0,
+                    y0 + r - self._fy)
+            self._damage(x0, y0, x1, y1)
+            return
+        with self.spi as spi:
+            self._window(spi, x0, y0, x1, y1)
+            if depth != 16:
+                for r in range(0, ch, rows):
+                    n = min(rows, ch - r)
+                    self._image_rows(src, (sy + r) * stride, stride, sx, cw,
+                        n, lut, depth)
+                    self._flip(spi, n * cw * 2)
+                self._drain(spi)
+            elif cw == w:
+                # whole rows are contiguous in the source
+                end = (sy + ch) * stride
+                for i in range(sy * stride, end, CHUNK * 2):
+                    spi.write(src[i:min(i + CHUNK * 2, end)])
+            else:
+                for r in range(sy, sy + ch):
+                    i = r * stride + sx * 2
+                    spi.write(src[i:i + cw * 2])
+
+    def _image_bands(self, img, x, y, x0, y0, x1, y1, rows):
+        # whole rows, as many as fit in the pixel buffer at a time
+        w = img.width
+        step = w * 2
+        sx = (x0 - x) * 2   # bytes into a row and first row drawn
+        sy = y0 - y
+        span = (x1 - x0 + 1) * 2
+        ch = y1 - y0 + 1
+        for r in range(0, ch, rows):
+            n = min(rows, ch - r)
+            img.read(sy + r, n, self._buf)
+            if self._fb is not None:
+                self._fill_main[1] = 0
+                self._fb.blit(FrameBuffer(self._buf, w, n, RGB565), x,
+                    y0 + r - self._fy, -1)
+                continue
+            # a transaction per band leaves the bus free for reading the
+            # file, the window continues with RAMWCONT
+            with self.spi as spi:
+                self._window(spi, x0, y0 + r, x1, y0 + r + n - 1)
+                if span == step:
+                    self._flip(spi, n * step)
+                else:
+                    self._fill_main[1] = 0
+                    mv = self._mv
+                    for i in range(n):
+                        spi.write(mv[i * step + sx:i * step + sx + span])
+                self._drain(spi)
+
+    def _image_spans(self, img, x, y, x0, y0, x1, y1):
+        # rows longer than the pixel buffer, read and sent in pieces
+        seg = CHUNK * 2 // img.size
+        for row in range(y0, y1 + 1):
+            for c in range(x0, x1 + 1, seg):
+                n = min(seg, x1 + 1 - c)
+                img.read_span(row - y, c - x, n, self._buf)
+                if self._fb is not None:
+                    self._fill_main[1] = 0
+                    self._fb.blit(FrameBuffer(self._buf, n, 1, RGB565), c,
+                        row - self._fy, -1)
+                    continue
+                with self.spi as spi:
+                    if c == x0:
+                        self._window(spi, x0, row, x1, row)
+                    else:
+                        # carry on along the row
+                        self._command(spi, RAMWCONT)
+                        self.dc(1)
+                    self._flip(spi, n * 2)
+                    self._drain(spi)
+
+    def _rows_held(self, y0, y1):
+        # rows y0 to y1 cut to those in the shadow buffer, or in the band
+        # being rendered
+        return max(y0, self._fy), min(y1, self._fy + self._fh - 1)
+
+    def _image_rows(self, src, soff, stride, sx, cw, n, lut, depth):
+        # n rows of cw pixels from sx on, the first at src[soff], into the
+        # pixel buffer
+        buf = self._buf
+        step = cw * 2
+        for r in range(n):
+            if depth == 16:
+                i = soff + sx * 2
+                buf[r * step:(r + 1) * step] = src[i:i + step]
+            else:
+                indexed(src, soff, sx, cw, buf, r * step, lut, depth)
+            soff += stride
+
+    def _palette_lut(self, palette, depth):
+        # expansion table for depth bit indices through palette, rebuilt
+        # only when the palette or depth changed since it was last used
+        colors = self._pal_colors
+        if depth == self._pal_depth and len(colors) == len(palette):
+            for i in range(len(colors)):
+                if colors[i] != palette[i]:
+                    break
+            else:
+                return self._pal_lut
+        if self._pal_lut is None:
+            # large enough for any depth, 2 bit needs the most
+            self._pal_lut = memoryview(bytearray(256 * 8))
+        build_palette(palette, depth, self._pal_lut)
+        self._pal_colors = list(palette)
+        self._pal_depth = depth
+        return self._pal_lut
+
+    def image(self, f, x = 0, y = 0):
+        """ Draw an image file (BMP with 16 or 24 bit pixels, or raw RGB565,
+        see ili9341.image) at x, y, clipped to the screen. f is a file name
+        or a file opened in binary mode. Rows are read a band at a time into
+        the pixel buffer, converted there and sent into one address window,
+        so images of any size take no more memory. Returns the image width
+        and height. """
+        if not isinstance(f, str):
+            return self._image_file(ImageFile(f), f, x, y)
+        with open(f, 'rb') as file:
+            return self._image_file(ImageFile(file), f, x, y)
+
+    def _image_file(self, img, source, x, y):
+        w = img.width
+        h = img.height
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w) - 1
+        y1 = min(self.height, y + h) - 1
+        if x1 < x0 or y1 < y0:
+            return w, h
+        if self._dlist is not None:
+            self._dlist.add(FILE, (x0, y0, x1, y1), None, (source, x, y),
+                self._colormap, self._font)
+            return w, h
+        if self._fb is not None:
+            # a banded flush replays the image for every band, only read
+            # the rows of this one
+            y0, y1 = self._rows_held(y0, y1)
+            if y1 < y0:
+                return w, h
+        rows = CHUNK * 2 // img.stride
+        if rows == 0:
+            self._image_spans(img, x, y, x0, y0, x1, y1)
+        else:
+            self._image_bands(img, x, y, x0, y0, x1, y1, rows)
+        if self._fb is not None:
+            self._damage(x0, y0, x1, y1)
+        return w, h
+
+    def _hlsb(self, bitbuff, w, h):
+        # let framebuf bring a 1-bit source into row major MONO_HLSB
+        stride = (w + 7) // 8
+        if len(self._hbuf) < stride * h:
+            self._hbuf = bytearray(stride * h)
+        hbuf = self._hbuf
+        hfb = FrameBuffer(hbuf, w, h, MONO_HLSB)
+        hfb.fill(0)
+        hfb.blit(bitbuff, 0, 0)
+        return hbuf
+
+    def _expansion(self, lsb = False):
+        # expansion table for the current colormap, rebuilt only when the
+        # colors changed since it was last used. lsb selects the table for
+        # sources with the leftmost pixel in the least significant bit
+        i = 1 if lsb else 0
+        lut = self._lut[i]
+        if lut is None:
+            lut = self._lut[i] = memoryview(bytearray(256 * 16))
+        elif self._lut_cmap[i] == self._colormap:
+            return lut
+        build_lut(self._colormap, lut, lsb)
+        self._lut_cmap[i][:] = self._colormap
+        return lut
+
+    def glyph_cache(self, budget = 8192):
+        """ Keep up to budget bytes of rendered glyphs so repeated text is
+        sent without per pixel work. budget 0 turns the cache off. The
+        GlyphCache is available as self.glyphs for its hit/miss counters. """
+        self.glyphs = GlyphCache(budget) if budget > 0 else None
+
+    def _font_lut(self, font):
+        # expansion table for hmap fonts, None for vmap ones
+        return self._expansion(font.reverse()) if font.hmap() else None
+
+    def _glyph_rows(self, glyph, char_w, height, lut, r0, n, cols, buf, doff, w):
+        # expand cols pixels of glyph rows r0 to r0 + n - 1 into buf at
+        # doff, rows w pixels apart. hmap glyphs are row major already and
+        # go through the table a byte at a time, vmap glyphs are picked a
+        # bit per column
+        step = w * 2
+        if lut is not None:
+            stride = (char_w + 7) >> 3
+            for r in range(r0, r0 + n):
+                bits(glyph, r * stride, cols, buf, doff, lut)
+                doff += step
+        else:
+            nbytes = (height + 7) >> 3
+            cmap = self._colormap
+            for r in range(r0, r0 + n):
+                vrow(glyph, r >> 3, nbytes, r & 7, cols, buf, doff, cmap)
+                doff += step
+
+    def column_text(self, enable = True):
+        """ Send vertically mapped fonts column by column in their stored
+        layout, with MADCTL's row/column exchange bit flipped for the text
+        window and restored to self.madctl afterwards. """
+        self._columns = enable
+
+    def _render_glyph(self, glyph, char_w, height, lut):
+        # a glyph as a block of big endian RGB565 pixels
+        block = bytearray(char_w * height * 2)
+        self._glyph_rows(glyph, char_w, height, lut, 0, height, char_w,
+            block, 0, char_w)
+        return block
+
+    def _cached_chars(self, str, x, y, height, clear):
+        # one window per glyph, cached blocks go out as they are
+        font = self._font
+        cmap = self._colormap
+        fg = cmap[2] << 8 | cmap[3]
+        bg = cmap[0] << 8 | cmap[1]
+        cache = self.glyphs
+        lut = self._font_lut(font)
+        with self.spi as spi:
+            for ch in str:
+                key = (font, ch, fg, bg)
+                entry = cache.get(key)
+                if entry is None:
+                    glyph, char_w = font.get_ch(ch)
+                    block = self._render_glyph(glyph, char_w, height, lut)
+                    cache.put(key, block, char_w)
+                else:
+                    block, char_w = entry[0], entry[1]
+                self._window(spi, x, y, x + char_w - 1, y + height - 1)
+                spi.write(block)
+                x += char_w
+            if clear:
+                self._clear_right(spi, x, y, height)
+        return x
+
+    def _stream_chars(self, str, x, y, str_w, height, clear):
+        # render straight from the font into the pixel buffer in RAMWR
+        # order, whole rows of the (right/bottom clipped) string per chunk
+        font = self._font
+        w = min(str_w, self.width - x)
+        h = min(height, self.height - y)
+        rows = CHUNK // w
+        lut = self._font_lut(font)
+        with self.spi as spi:
+            self._window(spi, x, y, x + w - 1, y + h - 1)
+            r0 = 0
+            while r0 < h:
+                n = min(rows, h - r0)
+                buf = self._buf
+                pos = 0
+                for ch in str:
+                    if pos >= w:
+                        break
+                    glyph, char_w = font.get_ch(ch)
+                    self._glyph_rows(glyph, char_w, height, lut, r0, n,
+                        min(char_w, w - pos), buf, pos * 2, w)
+                    pos += char_w
+                self._flip(spi, n * w * 2)
+                r0 += n
+            self._drain(spi)
+            if clear:
+                self._clear_right(spi, x + str_w, y, height)
+        return x + str_w
+
+    def _column_chars(self, str, x, y, str_w, height, clear):
+        # with MV flipped the column address runs down the screen: CASET
+        # takes the rows and PASET the columns of the window, and every
+        # glyph column goes out top to bottom as stored, bit 0 first
+        font = self._font
+        w = min(str_w, self.width - x)
+        h = min(height, self.height - y)
+        nbytes = (height + 7) >> 3
+        lut = self._expansion(not font.reverse())
+        cols = CHUNK // h
+        step = h * 2
+        with self.spi as spi:
+            self._command(spi, MADCTL, self._madctl_mv)
+            self._command(spi, CASET, self._words(y, y + h - 1))
+            self._command(spi, PASET, self._words(x, x + w - 1))
+            self._command(spi, RAMWR)
+            self.dc(1)
+            n = 0
+            pos = 0
+            for ch in str:
+                if pos >= w:
+                    break
+                glyph, char_w = font.get_ch(ch)
+                for i in range(min(char_w, w - pos)):
+                    # the last byte of a column only has h & 7 rows left
+                    bits(glyph, i * nbytes, h, self._buf, n * step, lut)
+                    n += 1
+                    if n == cols:
+                        self._flip(spi, n * step)
+                        n = 0
+                pos += char_w
+            if n:
+                self._flip(spi, n * step)
+            self._drain(spi)
+            self._command(spi, MADCTL, self.madctl)
+            self._invalidate_window()
+            if clear:
+                self._clear_right(spi, x + str_w, y, height)
+        return x + str_w
 
     def chars(self, str, x, y):
-        str_w  = self._font.get_width(str)
-        div, rem = divmod(self._font.height(),8)
-        nbytes = div+1 if rem else div
-        buf = bytearray(str_w * nbytes)
+        return self._chars(str, x, y, self._font.get_width(str))
+
+    def _chars(self, str, x, y, str_w, clear = False):
+        # chars() for a string already measured. With clear, the rest of
+        # the row right of the string is filled with the background, on
+        # screen in the same transaction
+        height = self._font.height()
+        if self._fb is None and self._dlist is None and str_w > 0 and (
+                0 <= x < self.width and 0 <= y < self.height):
+            if (self.glyphs is not None and x + str_w <= self.width
+                    and y + height <= self.height):
+                return self._cached_chars(str, x, y, height, clear)
+            if self._columns and not self._font.hmap():
+                return self._column_chars(str, x, y, str_w, height, clear)
+            return self._stream_chars(str, x, y, str_w, height, clear)
+        if str_w > 0:
+            self._buffer_chars(str, x, y, str_w, height)
+        if clear and x + str_w < self.width:
+            start = max(0, x + str_w)
+            self.fill_rectangles(((start, y, self.width - start, height),))
+        return x + str_w
+
+    def _clear_right(self, spi, x, y, height):
+        # background from x to the right edge, inside an open transaction
+        if x < self.width:
+            cmap = self._colormap
+            self._fill(spi, x, y, self.width - x, min(height, self.height - y),
+                cmap[0] << 8 | cmap[1])
+
+    def _buffer_chars(self, str, x, y, str_w, height):
+        # through a scratch framebuffer and blit(), for display lists,
+        # shadow buffers and strings starting off the screen
+        if self._dlist is not None:
+            self._dlist.add(CHARS, clip(x, y, str_w, height, self.width,
+                self.height), None, (str, x, y), self._colormap, self._font)
+            return
+        hmap = self._font.hmap()
+        if hmap:
+            size = (str_w + 7) // 8 * height
+            fmt = MONO_HLSB
+        else:
+            nbytes = (height + 7) // 8
+            size = str_w * nbytes
+            fmt = MONO_VLSB
+        if len(self._text) < size:
+            self._text = bytearray(size)
+            self._text_fb = None
+        buf = self._text
+        # the FrameBuffer over the scratch buffer is kept for repeated
+        # strings of the same size
+        fb = self._text_fb
+        if (fb is None or self._text_w != str_w or self._text_h != height
+                or self._text_fmt != fmt):
+            fb = self._text_fb = FrameBuffer(buf, str_w, height, fmt)
+            self._text_w = str_w
+            self._text_h = height
+            self._text_fmt = fmt
         pos = 0
         for ch in str:
             glyph, char_w = self._font.get_ch(ch)
-            for row in range(nbytes):
-                index = row*str_w + pos
-                for i in range(char_w):
-                    buf[index+i] = glyph[nbytes*i+row]
+            if hmap:
+                # framebuf places rows that do not start on a byte boundary
+                gfmt = MONO_HMSB if self._font.reverse() else MONO_HLSB
+                fb.blit(FrameBuffer(bytearray(glyph), char_w, height, gfmt), pos, 0)
+            else:
+                transpose(glyph, nbytes, char_w, buf, str_w, pos)
             pos += char_w
-        fb = FrameBuffer(buf, str_w, self._font.height(), MONO_VLSB)
-        self.blit(fb, x, y, str_w, self._font.height())
-        return x + str_w
+        self.blit(fb, x, y, str_w, height)
 
     def bitmap(self, bitmap, x, y, w, h):
-        fb = FrameBuffer(bytearray(bitmap), w, h, MONO_VLSB)
+        if self._dlist is not None:
+            self._dlist.add(BITMAP, clip(x, y, w, h, self.width, self.height),
+                None, (bitmap, x, y, w, h), self._colormap, self._font)
+            return x + w
+        # framebuf needs writable memory, only copy what isn't
+        if not isinstance(bitmap, bytearray):
+            bitmap = bytearray(bitmap)
+        fb = FrameBuffer(bitmap, w, h, MONO_VLSB)
         self.blit(fb, x, y, w, h)
         return x + w
 
+    def set_scroll_area(self, top = 0, bottom = 0):
+        """ Keep top rows at the top and bottom rows at the bottom of the
+        screen fixed and scroll only the rows in between. For text, the
+        scrolling area should be a multiple of the font height. """
+        if top < 0 or bottom < 0 or top + bottom >= self.height:
+            raise ValueError('invalid scroll area')
+        self._top = top
+        self._bottom = bottom
+        with self.spi as spi:
+            self._command(spi, VSCRDEF, self._words(top, self.height - top - bottom))
+            spi.write(self._word(bottom))
+        self.reset_scroll()
+
     def scroll(self, dy):
-        self._scroll = (self._scroll + dy) % self.height
-        self._write(VSCRSADD, pack(">H", self._scroll))
+        top = self._top
+        self._scroll = (self._scroll + dy) % (self.height - top - self._bottom)
+        self._write(VSCRSADD, self._word(top + self._scroll))
 
     def next_line(self, cury, char_h):
-        global scrolling
+        top = self._top
+        end = self.height - self._bottom
         if not self.scrolling:
             res = cury + char_h
-            self.scrolling = (res >= self.height)
+            self.scrolling = (res + char_h > end)
         if self.scrolling:
             self.scroll(char_h)
-            res = (self.height - char_h + self._scroll)%self.height
-            self.fill_rectangle(0, res, self.width, self._font.height())
+            res = top + (self._scroll - char_h) % (end - top)
+            self.fill_rectangle(0, res, self.width, min(char_h, end - res))
         return res
 
     def write(self, text): #does character wrap, compatible with stream output
+        font = self._font
         curx = self._x; cury = self._y
-        char_h = self._font.height()
-        width = 0
-        written = 0
-        for pos, ch in enumerate(text):
-            if ch == '\n':
-                if pos>0:
-                    self.chars(text[written:pos],curx,cury)
-                curx = 0; written = pos+1; width = 0
+        char_h = font.height()
+        fit = measures(font)[1]
+        for i, line in enumerate(text.split('\n')):
+            if i > 0:
+                curx = 0
+                cury = self.next_line(cury,char_h)
+            start = 0
+            while start < len(line):
+                # characters ending left of the last column
+                n = fit(line, self.width - 1 - curx, start)
+                if start + n == len(line):
+                    curx = self.chars(line[start:], curx,cury)
+                    break
+                if n == 0 and curx == 0:
+                    n = 1   # wider than the screen, drawn clipped
+                if n > 0:
+                    self.chars(line[start:start + n], curx,cury)
+                start += n
+                curx = 0
                 cury = self.next_line(cury,char_h)
-            else:
-                char_w = self._font.get_width(ch)
-                if curx + width + char_w >= self.width:
-                    self.chars(text[written:pos], curx,cury)
-                    curx = 0 ; written = pos; width = char_h
-                    cury = self.next_line(cury,char_h)
-                else:
-                    width += char_w
-        if written<len(text):
-            curx = self.chars(text[written:], curx,cury)
         self._x = curx; self._y = cury
 
 
+    def layout_cache(self, size = 8):
+        """ Keep the line breaks of up to size texts print() laid out, so
+        printing them again skips all measuring. size 0 turns the cache
+        off. The LayoutCache is available as self.layouts. """
+        self.layouts = LayoutCache(size) if size > 0 else None
+
     def print(self, text): #does word wrap, leaves self._x unchanged
-        cury = self._y; curx = self._x
-        char_h = self._font.height()
-        char_w = self._font.max_width()
-        lines = text.split('\n')
-        for line in lines:
-            words = line.split(' ')
-            for word in words:
-                if curx + self._font.get_width(word) >= self.width:
-                    curx = self._x; cury = self.next_line(cury,char_h)
-                    while self._font.get_width(word) > self.width:
-                        self.chars(word[:self.width//char_w],curx,cury)
-                        word = word[self.width//char_w:]
-                        cury = self.next_line(cury,char_h)
-                if len(word)>0:
-                    curx = self.chars(word+' ', curx,cury)
-            curx = self._x; cury = self.next_line(cury,char_h)
+        font = self._font
+        cury = self._y
+        char_h = font.height()
+        # each line and a fill of the rest of its row go out in one
+        # transaction
+        if self.layouts is not None:
+            lines = self.layouts.get(text, font, self.width - self._x).lines
+        else:
+            lines = wrap(text, font, self.width - self._x)
+        for line, w in lines:
+            self._chars(line, self._x, cury, w, True)
+            cury = self.next_line(cury,char_h)
         self._y = cury
@@ -0,0 +1,110 @@
+# Image files for the ILI9341 driver, read a band of rows at a time
+# MIT License
+#
+# Two kinds of files are read: uncompressed BMP with 16 bit (RGB565 or
+# RGB555) or 24 bit pixels, stored bottom-up or top-down, and raw files of
+# a 4 byte header, width and height as little endian 16 bit words, followed
+# by big endian RGB565 rows top to bottom. That is the order the controller
+# takes, so raw rows go to the display as they are read.
+
+from micropython import const
+from ustruct import unpack
+
+try:
+    from ili9341.kernels_viper import swap16, rgb555_to_565, bgr888_to_565
+except (ImportError, SyntaxError, ValueError, AttributeError, TypeError):
+    from ili9341.kernels import swap16, rgb555_to_565, bgr888_to_565
+
+# pixel formats
+RAW    = const(0)   # big endian RGB565
+RGB565 = const(1)   # little endian RGB565
+RGB555 = const(2)   # little endian XRGB1555
+BGR888 = const(3)
+
+
+class ImageFile:
+    """ Header of an image file opened in binary mode, and its rows read on
+    demand. width, height and format describe the image, size is the
+    number of bytes a pixel and stride the number a row takes in the
+    file. """
+
+    def __init__(self, f):
+        self.f = f
+        f.seek(0)
+        head = f.read(58)
+        self.bottom_up = False
+        if head[:2] == b'BM':
+            self.offset = unpack('<I', head[10:14])[0]
+            w, h, planes, bpp, compression = unpack('<iiHHI', head[18:34])
+            if h > 0:
+                self.bottom_up = True
+            else:
+                h = -h
+            if bpp == 24 and compression == 0:
+                self.format = BGR888
+            elif bpp == 16 and compression == 0:
+                self.format = RGB555
+            elif bpp == 16 and compression == 3:
+                # bit fields, the red mask comes first after the 40 byte
+                # header, in later header versions too
+                red = unpack('<I', head[54:58])[0]
+                if red == 0xF800:
+                    self.format = RGB565
+                elif red == 0x7C00:
+                    self.format = RGB555
+                else:
+                    raise ValueError('unsupported BMP bit fields')
+            else:
+                raise ValueError('unsupported BMP format')
+            self.size = bpp // 8
+            self.stride = (w * self.size + 3) & ~3
+        else:
+            w, h = unpack('<HH', head[:4])
+            self.offset = 4
+            self.format = RAW
+            self.size = 2
+            self.stride = w * 2
+        self.width = w
+        self.height = h
+        self._next = -1     # row the file is positioned at, if read in order
+        fmt = self.format
+        self._convert = (None if fmt == RAW else swap16 if fmt == RGB565
+            else rgb555_to_565 if fmt == RGB555 else bgr888_to_565)
+
+    def read(self, row, n, buf):
+        """ Read the n rows from row on, counted from the top, into buf as
+        big endian RGB565 rows width pixels long. buf must hold n * stride
+        bytes. """
+        f = self.f
+        mv = memoryview(buf)
+        stride = self.stride
+        if self.bottom_up:
+            # the band is stored bottom row first, read each row into its
+            # place from the end of the buffer
+            f.seek(self.offset + (self.height - row - n) * stride)
+            for i in range(n - 1, -1, -1):
+                f.readinto(mv[i * stride:(i + 1) * stride])
+        else:
+            if row != self._next:
+                f.seek(self.offset + row * stride)
+            f.readinto(mv[:n * stride])
+            self._next = row + n
+        # convert in place, rows move down to width * 2 bytes apart
+        convert = self._convert
+        if convert is None:
+            return
+        w = self.width
+        for i in range(n):
+            convert(buf, i * stride, i * w * 2, w)
+
+    def read_span(self, row, col, n, buf):
+        """ Read n pixels of row from column col on into buf as big endian
+        RGB565, for rows too long to read whole. buf must hold n * size
+        bytes. """
+        if self.bottom_up:
+            row = self.height - 1 - row
+        self.f.seek(self.offset + row * self.stride + col * self.size)
+        self.f.readinto(memoryview(buf)[:n * self.size])
+        self._next = -1
+        if self._convert is not None:
+            self._convert(buf, 0, 0, n)
@@ -0,0 +1,153 @@
+# Pixel expansion kernels for the ILI9341 driver
+# MIT License
+
+
+def build_lut(colormap, lut, lsb = False):
+    """ Fill lut (256 * 16 bytes) with the 8 big endian RGB565 pixels each
+    byte value stands for, most significant bit first (least significant
+    first if lsb), using the background/foreground colormap. """
+    bg_hi = colormap[0]; bg_lo = colormap[1]
+    fg_hi = colormap[2]; fg_lo = colormap[3]
+    order = range(8) if lsb else range(7, -1, -1)
+    i = 0
+    for b in range(256):
+        for bit in order:
+            if (b >> bit) & 1:
+                lut[i] = fg_hi; lut[i + 1] = fg_lo
+            else:
+                lut[i] = bg_hi; lut[i + 1] = bg_lo
+            i += 2
+
+
+def build_palette(palette, depth, lut):
+    """ Fill lut (256 * 16 // depth bytes) with the big endian RGB565
+    pixels each byte value stands for as 8 // depth palette indices of
+    depth (2, 4 or 8) bits, leftmost pixel in the most significant bits.
+    Indices past the end of palette come out black. """
+    mask = (1 << depth) - 1
+    n = len(palette)
+    i = 0
+    for b in range(256):
+        for shift in range(8 - depth, -1, -depth):
+            k = (b >> shift) & mask
+            c = palette[k] if k < n else 0
+            lut[i] = c >> 8; lut[i + 1] = c & 255
+            i += 2
+
+
+def bits(src, soff, npix, dst, doff, lut):
+    """ Expand npix 1-bit pixels starting at src[soff] into dst[doff],
+    a whole source byte at a time. lut is a memoryview on a table built by
+    build_lut and decides the bit order. """
+    for i in range(soff, soff + (npix >> 3)):
+        b = src[i] << 4
+        dst[doff:doff + 16] = lut[b:b + 16]
+        doff += 16
+    rem = npix & 7
+    if rem:
+        b = src[soff + (npix >> 3)] << 4
+        dst[doff:doff + rem * 2] = lut[b:b + rem * 2]
+
+
+def indexed(src, soff, sx, npix, dst, doff, lut, depth):
+    """ Expand npix depth-bit palette indices, starting sx pixels into the
+    row at src[soff], into dst[doff] a whole source byte at a time through
+    a table built by build_palette. """
+    ppb = 8 // depth
+    size = ppb * 2
+    i = soff + sx // ppb
+    end = doff + npix * 2
+    lead = sx % ppb
+    if lead:
+        # rest of a byte whose first pixels are clipped
+        b = src[i] * size + lead * 2
+        n = min(size - lead * 2, end - doff)
+        dst[doff:doff + n] = lut[b:b + n]
+        doff += n
+        i += 1
+    while doff + size <= end:
+        b = src[i] * size
+        dst[doff:doff + size] = lut[b:b + size]
+        doff += size
+        i += 1
+    if doff < end:
+        b = src[i] * size
+        dst[doff:end] = lut[b:b + end - doff]
+
+
+def fill(buf, npix, color):
+    """ Set the first npix pixels of buf to the RGB565 color, doubling the
+    filled part with slice copies. """
+    if npix <= 0:
+        return
+    buf[0] = color >> 8; buf[1] = color & 255
+    mv = memoryview(buf)
+    n = 2
+    end = npix * 2
+    while n < end:
+        k = min(n, end - n)
+        mv[n:n + k] = mv[:k]
+        n += k
+
+
+def transpose(glyph, nbytes, char_w, dst, str_w, pos):
+    """ Copy the columns of a MONO_VLSB glyph nbytes high into the row
+    major byte layout of a MONO_VLSB string buffer str_w wide, at column
+    pos. """
+    for row in range(nbytes):
+        index = row * str_w + pos
+        for i in range(char_w):
+            dst[index + i] = glyph[nbytes * i + row]
+
+
+def rgb666_to_565(src, dst, offset, n):
+    """ Convert n pixels read back as R, G, B bytes (6 significant bits
+    each) to big endian RGB565 at dst[offset]. """
+    j = 0
+    for i in range(offset, offset + n * 2, 2):
+        g = src[j + 1]
+        dst[i] = src[j] & 0xF8 | g >> 5
+        dst[i + 1] = (g << 3) & 0xE0 | src[j + 2] >> 3
+        j += 3
+
+
+def swap16(buf, soff, doff, n):
+    """ Turn n little endian RGB565 pixels at buf[soff] into big endian at
+    buf[doff], which may be the same place or below it. """
+    for i in range(0, n * 2, 2):
+        lo = buf[soff + i]
+        buf[doff + i] = buf[soff + i + 1]
+        buf[doff + i + 1] = lo
+
+
+def rgb555_to_565(buf, soff, doff, n):
+    """ Convert n little endian XRGB1555 pixels at buf[soff] to big endian
+    RGB565 at buf[doff], which may be the same place or below it. """
+    for i in range(0, n * 2, 2):
+        lo = buf[soff + i]
+        hi = buf[soff + i + 1]
+        buf[doff + i] = (hi << 1) & 0xF8 | (hi & 0x03) << 1 | lo >> 7
+        buf[doff + i + 1] = (lo << 1) & 0xC0 | lo & 0x1F
+
+
+def bgr888_to_565(buf, soff, doff, n):
+    """ Convert n B, G, R byte pixels at buf[soff] to big endian RGB565 at
+    buf[doff], which may be the same place or below it. """
+    j = soff
+    for i in range(doff, doff + n * 2, 2):
+        b = buf[j]
+        g = buf[j + 1]
+        buf[i] = buf[j + 2] & 0xF8 | g >> 5
+        buf[i + 1] = (g << 3) & 0xE0 | b >> 3
+        j += 3
+
+
+def vrow(src, soff, step, bit, npix, dst, doff, cmap):
+    """ Expand one pixel row of MONO_VLSB column data into dst[doff]:
+    npix pixels from bit of every step-th byte starting at src[soff],
+    colored through the 4 byte background/foreground colormap. """
+    for i in range(soff, soff + npix * step, step):
+        c = (src[i] >> bit) & 1
+        dst[doff] = cmap[c * 2]
+        dst[doff + 1] = cmap[c * 2 + 1]
+        doff += 2
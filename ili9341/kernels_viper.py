@@ -0,0 +1,147 @@
+# Viper versions of the kernels in kernels.py, same signatures.
+# Importing this fails on ports built without the native emitters, the
+# driver then falls back to kernels.py.
+# MIT License
+
+import micropython
+
+
+@micropython.viper
+def bits(src, soff: int, npix: int, dst, doff: int, lut):
+    s = ptr8(src)
+    d = ptr16(dst)      # doff and table offsets are even, copy in halfwords
+    t = ptr16(lut)
+    doff >>= 1
+    i = soff
+    end = soff + (npix >> 3)
+    while i < end:
+        b = s[i] << 3
+        k = 0
+        while k < 8:
+            d[doff + k] = t[b + k]
+            k += 1
+        doff += 8
+        i += 1
+    rem = npix & 7
+    if rem:
+        b = s[end] << 3
+        k = 0
+        while k < rem:
+            d[doff + k] = t[b + k]
+            k += 1
+
+
+@micropython.viper
+def indexed(src, soff: int, sx: int, npix: int, dst, doff: int, lut, depth: int):
+    s = ptr8(src)
+    d = ptr16(dst)
+    t = ptr16(lut)
+    # pixels per source byte as a power of two
+    shift = 0
+    if depth == 2:
+        shift = 2
+    elif depth == 4:
+        shift = 1
+    mask = (1 << shift) - 1
+    doff >>= 1
+    p = sx
+    end = sx + npix
+    while p < end:
+        d[doff] = t[(s[soff + (p >> shift)] << shift) + (p & mask)]
+        doff += 1
+        p += 1
+
+
+@micropython.viper
+def fill(buf, npix: int, color: int):
+    p = ptr16(buf)
+    # stored little endian, so swap to get the big endian byte order
+    c = ((color & 0xFF) << 8) | ((color >> 8) & 0xFF)
+    i = 0
+    while i < npix:
+        p[i] = c
+        i += 1
+
+
+@micropython.viper
+def transpose(glyph, nbytes: int, char_w: int, dst, str_w: int, pos: int):
+    g = ptr8(glyph)
+    d = ptr8(dst)
+    row = 0
+    while row < nbytes:
+        index = row * str_w + pos
+        i = 0
+        while i < char_w:
+            d[index + i] = g[nbytes * i + row]
+            i += 1
+        row += 1
+
+
+@micropython.viper
+def rgb666_to_565(src, dst, offset: int, n: int):
+    s = ptr8(src)
+    d = ptr8(dst)
+    j = 0
+    i = offset
+    end = offset + n * 2
+    while i < end:
+        g = s[j + 1]
+        d[i] = (s[j] & 0xF8) | (g >> 5)
+        d[i + 1] = ((g << 3) & 0xE0) | (s[j + 2] >> 3)
+        j += 3
+        i += 2
+
+
+@micropython.viper
+def swap16(buf, soff: int, doff: int, n: int):
+    b = ptr8(buf)
+    i = 0
+    end = n * 2
+    while i < end:
+        lo = b[soff + i]
+        b[doff + i] = b[soff + i + 1]
+        b[doff + i + 1] = lo
+        i += 2
+
+
+@micropython.viper
+def rgb555_to_565(buf, soff: int, doff: int, n: int):
+    b = ptr8(buf)
+    i = 0
+    end = n * 2
+    while i < end:
+        lo = b[soff + i]
+        hi = b[soff + i + 1]
+        b[doff + i] = ((hi << 1) & 0xF8) | ((hi & 0x03) << 1) | (lo >> 7)
+        b[doff + i + 1] = ((lo << 1) & 0xC0) | (lo & 0x1F)
+        i += 2
+
+
+@micropython.viper
+def bgr888_to_565(buf, soff: int, doff: int, n: int):
+    b = ptr8(buf)
+    j = soff
+    i = doff
+    end = doff + n * 2
+    while i < end:
+        blue = b[j]
+        g = b[j + 1]
+        b[i] = (b[j + 2] & 0xF8) | (g >> 5)
+        b[i + 1] = ((g << 3) & 0xE0) | (blue >> 3)
+        j += 3
+        i += 2
+
+
+@micropython.viper
+def vrow(src, soff: int, step: int, bit: int, npix: int, dst, doff: int, cmap):
+    s = ptr8(src)
+    d = ptr8(dst)
+    m = ptr8(cmap)
+    i = soff
+    end = soff + npix * step
+    while i < end:
+        c = ((s[i] >> bit) & 1) << 1
+        d[doff] = m[c]
+        d[doff + 1] = m[c + 1]
+        doff += 2
+        i += step
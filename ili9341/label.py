@@ -0,0 +1,59 @@
+# Incrementally updated text fields for the ILI9341 driver
+# MIT License
+
+from ili9341.layout import measures
+
+
+class Label:
+    """ Text at a fixed position and font that remembers what it shows.
+    update() redraws only the characters that changed or moved and clears
+    what a longer previous string leaves over. Drawing uses the display's
+    colors; a color change repaints the whole label, and after anything
+    else drew over it redraw() does. """
+
+    def __init__(self, display, x, y, font = None):
+        self.display = display
+        self.x = x
+        self.y = y
+        self.font = display._font if font is None else font
+        self._prefix_widths = measures(self.font)[0]
+        self.text = ''
+        self._widths = [0]      # prefix widths of text
+        self._cmap = None       # colors text was drawn with
+
+    def _kept(self, text, widths, i):
+        # True if character i is already on the screen in the same place
+        old = self.text
+        return i < len(old) and text[i] == old[i] and widths[i] == self._widths[i]
+
+    def update(self, text):
+        d = self.display
+        font = d._font
+        d.set_font(self.font)
+        widths = self._prefix_widths(text)
+        full = self._cmap != d._colormap
+        i = 0
+        n = len(text)
+        while i < n:
+            if not full and self._kept(text, widths, i):
+                i += 1
+                continue
+            # one chars() call per run of changed characters
+            j = i + 1
+            while j < n and (full or not self._kept(text, widths, j)):
+                j += 1
+            d.chars(text[i:j], self.x + widths[i], self.y)
+            i = j
+        tail = self._widths[-1] - widths[-1]
+        if tail > 0:
+            d.fill_rectangle(self.x + widths[-1], self.y, tail,
+                self.font.height())
+        d.set_font(font)
+        self.text = text
+        self._widths = widths
+        self._cmap = bytes(d._colormap)
+        return self.x + widths[-1]
+
+    def redraw(self):
+        self._cmap = None
+        return self.update(self.text)
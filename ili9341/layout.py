@@ -0,0 +1,125 @@
+# Paragraph layout for the ILI9341 driver
+# MIT License
+
+
+def measures(font):
+    """ font's prefix_widths(s) and fit(s, width, start) functions. Fonts
+    made by earlier font_to_py versions or by hand may only have
+    get_width(s), for them both are built on that. """
+    if hasattr(font, 'fit') and hasattr(font, 'prefix_widths'):
+        return font.prefix_widths, font.fit
+    get_width = font.get_width
+
+    def prefix_widths(s):
+        widths = [0]
+        width = 0
+        for ch in s:
+            width += get_width(ch)
+            widths.append(width)
+        return widths
+
+    def fit(s, width, start = 0):
+        i = start
+        end = len(s)
+        while i < end:
+            width -= get_width(s[i])
+            if width < 0:
+                break
+            i += 1
+        return i - start
+
+    return prefix_widths, fit
+
+
+def wrap(text, font, width):
+    """ Break text into the lines ILI9341.print() draws in a box width
+    pixels wide, as [string, pixel width] pairs. Words are measured a
+    paragraph at a time. """
+    space = font.get_width(' ')
+    prefix_widths, fit = measures(font)
+    lines = []
+    for para in text.split('\n'):
+        pw = prefix_widths(para)
+        words = []
+        curx = 0
+        start = 0
+        for word in para.split(' '):
+            end = start + len(word)
+            w = pw[end] - pw[start]
+            start = end + 1
+            if curx + w >= width:
+                lines.append([' '.join(words), max(0, curx - space)])
+                words = []
+                curx = 0
+                # split words too long for a line where they overflow
+                while w > width:
+                    n = max(1, fit(word, width))
+                    lines.append([word[:n], font.get_width(word[:n])])
+                    word = word[n:]
+                    w = font.get_width(word)
+            if len(word)>0:
+                words.append(word)
+                curx += w + space
+        lines.append([' '.join(words), max(0, curx - space)])
+    return lines
+
+
+class Paragraph:
+    """ text laid out by wrap() once for a box width pixels wide, to be
+    drawn any number of times at any x without measuring it again. """
+
+    def __init__(self, text, font, width):
+        self.text = text
+        self.font = font
+        self.width = width
+        self.lines = wrap(text, font, width)
+        self.height = len(self.lines) * font.height()
+
+    def draw(self, display, x, y):
+        """ Draw the lines below each other from x, y, moving down (and
+        scrolling at the bottom) as print() does. Returns the y of the
+        line after the last. """
+        font = display._font
+        display.set_font(self.font)
+        char_h = self.font.height()
+        for line, w in self.lines:
+            display._chars(line, x, y, w)
+            y = display.next_line(y, char_h)
+        display.set_font(font)
+        return y
+
+
+class LayoutCache:
+    """ Paragraphs by text, font and width, at most size of
+    them. The least recently used paragraph is dropped first. hits and
+    misses count lookups. """
+
+    def __init__(self, size):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # key: [paragraph, last use]
+        self._tick = 0
+
+    def get(self, text, font, width):
+        key = (text, font, width)
+        self._tick += 1
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            entry[1] = self._tick
+            return entry[0]
+        self.misses += 1
+        entries = self._entries
+        if len(entries) >= self.size:
+            oldest = None
+            for k in entries:
+                if oldest is None or entries[k][1] < entries[oldest][1]:
+                    oldest = k
+            del entries[oldest]
+        paragraph = Paragraph(text, font, width)
+        entries[key] = [paragraph, self._tick]
+        return paragraph
+
+    def clear(self):
+        self._entries = {}
@@ -0,0 +1,230 @@
+# Shapes for the ILI9341 driver, drawn as horizontal and vertical runs
+# MIT License
+#
+# Every shape is broken into runs of pixels along a row or a column, and
+# filled shapes into spans per row, equal spans on consecutive rows being
+# stacked into one rectangle. Each run then costs one address window
+# instead of one per pixel, and all of a shape goes out in a single
+# transaction through ILI9341.fill_rectangles().
+
+from math import ceil
+
+
+def _run(rects, a, b, c, vertical):
+    # the run from a to b (either order) in row c, or column c if vertical
+    if a > b:
+        a, b = b, a
+    if vertical:
+        rects.append((c, a, 1, b - a + 1))
+    else:
+        rects.append((a, c, b - a + 1, 1))
+
+
+def _line(rects, x0, y0, x1, y1):
+    # Bresenham, one run per step of the minor axis
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    steep = dy > dx
+    if steep:
+        x0, y0, x1, y1, dx, dy = y0, x0, y1, x1, dy, dx
+    sx = 1 if x1 >= x0 else -1
+    sy = 1 if y1 >= y0 else -1
+    err = dx >> 1
+    x = start = x0
+    y = y0
+    for i in range(dx):
+        x += sx
+        err -= dy
+        if err < 0:
+            _run(rects, start, x - sx, y, steep)
+            y += sy
+            err += dx
+            start = x
+    _run(rects, start, x, y, steep)
+
+
+def _stack(rows):
+    # rectangles for (y, [(x0, x1), ...]) rows given from the top, a span
+    # repeated on the next row grows the rectangle it started
+    rects = []
+    growing = {}
+    last = None
+    for y, spans in rows:
+        below = {}
+        for span in spans:
+            r = growing.get(span) if last == y - 1 else None
+            if r is None:
+                r = [span[0], y, span[1] - span[0] + 1, 1]
+                rects.append(r)
+            else:
+                r[3] += 1
+            below[span] = r
+        growing = below
+        last = y
+    return rects
+
+
+def _octant(r):
+    # midpoint circle points of one octant, x counting up from 0
+    points = []
+    x = 0
+    y = r
+    d = 1 - r
+    while x <= y:
+        points.append((x, y))
+        x += 1
+        if d < 0:
+            d += 2 * x + 1
+        else:
+            y -= 1
+            d += 2 * (x - y) + 1
+    return points
+
+
+def _arcs(rects, cx0, cy0, cx1, cy1, r):
+    # outline of a circle of radius r cut open at the centre lines, its
+    # quarters centred on cx0/cx1, cy0/cy1 and joined by straight edges:
+    # a circle when cx0 == cx1 and cy0 == cy1, else a rounded rectangle
+    points = _octant(r)
+    i = 0
+    while i < len(points):
+        # points sharing y are a run in the rows cy0 - y and cy1 + y, and
+        # mirrored, in the columns cx0 - y and cx1 + y
+        xs, y = points[i]
+        while i < len(points) and points[i][1] == y:
+            i += 1
+        xe = points[i - 1][0]
+        if xs == 0:
+            _run(rects, cx0 - xe, cx1 + xe, cy0 - y, False)
+            _run(rects, cx0 - xe, cx1 + xe, cy1 + y, False)
+            _run(rects, cy0 - xe, cy1 + xe, cx0 - y, True)
+            _run(rects, cy0 - xe, cy1 + xe, cx1 + y, True)
+            continue
+        for c in (cy0 - y, cy1 + y):
+            _run(rects, cx0 - xe, cx0 - xs, c, False)
+            _run(rects, cx1 + xs, cx1 + xe, c, False)
+        for c in (cx0 - y, cx1 + y):
+            _run(rects, cy0 - xe, cy0 - xs, c, True)
+            _run(rects, cy1 + xs, cy1 + xe, c, True)
+
+
+def _rounded(cx0, cy0, cx1, cy1, r):
+    # the filled counterpart of _arcs, as stacked row spans
+    half = [0] * (r + 1)
+    for x, y in _octant(r):
+        half[y] = max(half[y], x)
+        half[x] = max(half[x], y)
+    rows = []
+    for dy in range(r, 0, -1):
+        rows.append((cy0 - dy, [(cx0 - half[dy], cx1 + half[dy])]))
+    for y in range(cy0, cy1 + 1):
+        rows.append((y, [(cx0 - r, cx1 + r)]))
+    for dy in range(1, r + 1):
+        rows.append((cy1 + dy, [(cx0 - half[dy], cx1 + half[dy])]))
+    return _stack(rows)
+
+
+def hline(display, x, y, w, color):
+    display.fill_rectangles(((x, y, w, 1),), color)
+
+
+def vline(display, x, y, h, color):
+    display.fill_rectangles(((x, y, 1, h),), color)
+
+
+def line(display, x0, y0, x1, y1, color):
+    rects = []
+    _line(rects, x0, y0, x1, y1)
+    display.fill_rectangles(rects, color)
+
+
+def rect(display, x, y, w, h, color):
+    if w <= 0 or h <= 0:
+        return
+    display.fill_rectangles(((x, y, w, 1), (x, y + h - 1, w, 1),
+        (x, y + 1, 1, h - 2), (x + w - 1, y + 1, 1, h - 2)), color)
+
+
+def circle(display, x, y, r, color):
+    rects = []
+    _arcs(rects, x, y, x, y, r)
+    display.fill_rectangles(rects, color)
+
+
+def fill_circle(display, x, y, r, color):
+    display.fill_rectangles(_rounded(x, y, x, y, r), color)
+
+
+def round_rect(display, x, y, w, h, r, color):
+    if w <= 0 or h <= 0:
+        return
+    r = max(0, min(r, (w - 1) // 2, (h - 1) // 2))
+    rects = []
+    _arcs(rects, x + r, y + r, x + w - 1 - r, y + h - 1 - r, r)
+    display.fill_rectangles(rects, color)
+
+
+def fill_round_rect(display, x, y, w, h, r, color):
+    r = max(0, min(r, (w - 1) // 2, (h - 1) // 2))
+    display.fill_rectangles(_rounded(x + r, y + r, x + w - 1 - r,
+        y + h - 1 - r, r), color)
+
+
+def triangle(display, x0, y0, x1, y1, x2, y2, color):
+    polygon(display, ((x0, y0), (x1, y1), (x2, y2)), color)
+
+
+def fill_triangle(display, x0, y0, x1, y1, x2, y2, color):
+    # a triangle is convex, so every row is one span between the outermost
+    # pixels of its edges, which covers exactly what triangle() draws
+    edges = []
+    _line(edges, x0, y0, x1, y1)
+    _line(edges, x1, y1, x2, y2)
+    _line(edges, x2, y2, x0, y0)
+    top = min(y0, y1, y2)
+    left = [None] * (max(y0, y1, y2) - top + 1)
+    right = [None] * len(left)
+    for x, y, w, h in edges:
+        for i in range(y - top, y - top + h):
+            if left[i] is None or x < left[i]:
+                left[i] = x
+            if right[i] is None or x + w - 1 > right[i]:
+                right[i] = x + w - 1
+    display.fill_rectangles(_stack([(top + i, [(left[i], right[i])])
+        for i in range(len(left))]), color)
+
+
+def polygon(display, points, color):
+    """ Outline through the (x, y) points, closed back to the first. """
+    rects = []
+    for i in range(len(points)):
+        x0, y0 = points[i - 1]
+        x1, y1 = points[i]
+        _line(rects, x0, y0, x1, y1)
+    display.fill_rectangles(rects, color)
+
+
+def fill_polygon(display, points, color):
+    """ Fill the pixels whose centres are inside the polygon through the
+    (x, y) points, by the even-odd rule, so it may be concave or cross
+    itself. """
+    top = min(p[1] for p in points)
+    bottom = max(p[1] for p in points)
+    rows = []
+    for y in range(top, bottom):
+        # where the edges cross the middle of the row
+        xs = []
+        for i in range(len(points)):
+            xa, ya = points[i - 1]
+            xb, yb = points[i]
+            if ya <= y < yb or yb <= y < ya:
+                xs.append(xa + (y + 0.5 - ya) * (xb - xa) / (yb - ya))
+        xs.sort()
+        spans = []
+        for i in range(0, len(xs) - 1, 2):
+            x0 = ceil(xs[i] - 0.5)
+            x1 = ceil(xs[i + 1] - 0.5) - 1
+            if x1 >= x0:
+                spans.append((x0, x1))
+        rows.append((y, spans))
+    display.fill_rectangles(_stack(rows), color)
@@ -353,27 +353,44 @@ version = '0.2'
 
 STR02 = """_mvfont = memoryview(_font)
 
-def _chr_addr(ordch):
-    offset = 2 * (ordch - {})
-    return int.from_bytes(_index[offset:offset + 2], 'little')
-    
+def _chr_addr(i):
+    return int.from_bytes(_index[2 * i:2 * i + 2], 'little')
+
 def get_width(s):
     width = 0
     for ch in s:
         ordch = ord(ch)
-        ordch = ordch + 1 if ordch >= {} and ordch <= {} else 32
-        offset = _chr_addr(ordch)
-        width += int.from_bytes(_font[offset:offset + 2], 'little')
+        width += _widths[ordch - {base} if ordch >= {min} and ordch <= {max} else 0]
     return width
 
+def prefix_widths(s):
+    # entry i is the width of s[:i]
+    widths = [0]
+    width = 0
+    for ch in s:
+        ordch = ord(ch)
+        width += _widths[ordch - {base} if ordch >= {min} and ordch <= {max} else 0]
+        widths.append(width)
+    return widths
+
+def fit(s, width, start = 0):
+    # how many characters of s from start fit in width pixels
+    i = start
+    end = len(s)
+    while i < end:
+        ordch = ord(s[i])
+        width -= _widths[ordch - {base} if ordch >= {min} and ordch <= {max} else 0]
+        if width < 0:
+            break
+        i += 1
+    return i - start
+
 def get_ch(ch):
     ordch = ord(ch)
-    ordch = ordch + 1 if ordch >= {} and ordch <= {} else {}
-    offset = _chr_addr(ordch)
-    width = int.from_bytes(_font[offset:offset + 2], 'little')
-    next_offs = _chr_addr(ordch +1)
-    return _mvfont[offset + 2:next_offs], width
- 
+    i = ordch - {base} if ordch >= {min} and ordch <= {max} else 0
+    offset = _chr_addr(i)
+    return _mvfont[offset + 2:_chr_addr(i + 1)], _widths[i]
+
 """
 
 def write_func(stream, name, arg):
@@ -387,6 +404,9 @@ def write_font(op_path, font_path, height, monospaced, hmap, reverse, minchar, m
     except freetype.ft_errors.FT_Exception:
         print("Can't open", font_path)
         return False
+    if fnt.max_width > 255:
+        print('Characters wider than 255 pixels are not supported')
+        return False
     try:
         with open(op_path, 'w') as stream:
             write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxchar)
@@ -414,7 +434,12 @@ def write_data(stream, fnt, font_path, monospaced, hmap, reverse, minchar, maxch
     bw_index = ByteWriter(stream, '_index')
     bw_index.odata(index)
     bw_index.eot()
-    stream.write(STR02.format(minchar, minchar, maxchar, minchar, maxchar, minchar))
+    # one byte per character in _index order, for measuring strings
+    # without touching the glyph data
+    bw_widths = ByteWriter(stream, '_widths')
+    bw_widths.odata(fnt[char][1] for char in fnt.charset)
+    bw_widths.eot()
+    stream.write(STR02.format(base = minchar - 1, min = minchar, max = maxchar))
 
 # BINARY OUTPUT
 # hmap reverse magic bytes